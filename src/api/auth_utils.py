@@ -1,35 +1,119 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
 from http import HTTPStatus
-from typing import Any
+from types import MappingProxyType
+from typing import Annotated, Any
 from uuid import UUID
 
 import jwt
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 
-from core.config import JWT_ALGORITHM, settings
+from core.config import settings
+from services.auth import AuthService, get_auth_service
+from utils.jwt_keys import get_jwt_keyring
+from utils.token_cache import decoded_token_cache
+from utils.token_claims import is_access_claims, unpack_access_claims
 
 # Для чтения access-токенов из заголовка запроса
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/auth/login")
 
 
 def decode_token(token: str) -> dict[str, Any] | None:
+    # Повторно предъявленный токен не нужно заново проверять и разбирать
+    if settings.decoded_token_cache_enabled:
+        payload = decoded_token_cache.get(token)
+        if payload is not None:
+            return payload
+
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[JWT_ALGORITHM])
-    except jwt.exceptions.InvalidTokenError:
+        payload = unpack_access_claims(get_jwt_keyring().decode(token))
+    except (jwt.exceptions.InvalidTokenError, KeyError, ValueError):
+        return None
+    # Refresh-токен подписан тем же ключом, но не принимается вместо access
+    if not is_access_claims(payload):
         return None
 
+    if settings.decoded_token_cache_enabled:
+        decoded_token_cache.put(token, payload)
+
     return payload
 
 
-def check_allow_affect_user(auth_data: dict[str, Any], user_id: UUID):
+@dataclass(frozen=True)
+class AuthContext:
+    """Данные access-токена текущего запроса"""
+
+    token: str
+    user_id: str
+    roles: frozenset[str]
+    payload: MappingProxyType
+
+    @classmethod
+    def from_payload(cls, token: str, payload: dict[str, Any]) -> "AuthContext":
+        return cls(
+            token=token,
+            user_id=payload["user_id"],
+            roles=frozenset(payload["roles"]),
+            payload=MappingProxyType(payload),
+        )
+
+    def has_any_role(self, roles: frozenset[str]) -> bool:
+        return not self.roles.isdisjoint(roles)
+
+
+async def get_auth_context(
+    access_token: Annotated[str, Depends(oauth2_scheme)],
+) -> AuthContext:
     """
-    Операции может производить только admin или пользователь со своим профилем
+    Разбирает access-токен. FastAPI кэширует зависимость в пределах запроса,
+    поэтому токен декодируется один раз для всех зависимостей маршрута.
     """
-    if "admin" not in auth_data["roles"] and str(user_id) != auth_data["user_id"]:
-        raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
+    payload = decode_token(access_token)
+    if not payload:
+        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
+    return AuthContext.from_payload(access_token, payload)
+
+
+class Require:
+    """
+    Зависимость FastAPI для защищённых маршрутов. Пропускает пользователя с
+    любой из ролей roles, а при self_param - и владельца профиля, id которого
+    передан в этом параметре пути. Права проверяются до обращения к Redis,
+    проверка отзыва токена выполняется один раз за запрос.
+    """
+
+    def __init__(self, roles: Iterable[str] = (), self_param: str | None = None):
+        self.roles = frozenset(roles)
+        self.self_param = self_param
+
+    def _is_self(self, request: Request, context: AuthContext) -> bool:
+        if not self.self_param:
+            return False
+        try:
+            user_id = UUID(request.path_params[self.self_param])
+        except (KeyError, ValueError):
+            return False
+        return str(user_id) == context.user_id
+
+    async def __call__(
+        self,
+        request: Request,
+        context: AuthContext = Depends(get_auth_context),
+        auth_service: AuthService = Depends(get_auth_service),
+    ) -> AuthContext:
+        if not context.has_any_role(self.roles) and not self._is_self(request, context):
+            raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
 
+        valid = getattr(request.state, "access_token_valid", None)
+        if valid is None:
+            valid = await auth_service.is_access_token_valid(
+                context.token, context.payload
+            )
+            request.state.access_token_valid = valid
+        if not valid:
+            raise HTTPException(
+                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
+            )
 
-def check_admin(auth_data: dict[str, Any]):
-    """Проверяет что только админ может получить доступ к endpoints"""
-    if "admin" not in auth_data["roles"]:
-        raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
+        return context
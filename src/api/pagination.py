@@ -0,0 +1,83 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import Query
+from fastapi_pagination import Params
+
+from core.config import settings
+from schemas.pagination import OffsetPage
+from utils.datetimes import to_naive_utc
+
+
+def encode_cursor(*values: Any) -> str:
+    """Непрозрачный курсор из значений ключа последней записи страницы"""
+    data = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list[str]:
+    """Значения ключа из курсора, ValueError для некорректного курсора"""
+    values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    if (
+        not isinstance(values, list)
+        or len(values) != 2
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def decode_time_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Ключ (время, id) из курсора. Время с часовым поясом приводится к UTC,
+    иначе его нельзя сравнить с колонкой без пояса
+    """
+    moment, row_id = decode_cursor(cursor)
+    return to_naive_utc(datetime.fromisoformat(moment)), UUID(row_id)
+
+
+class CursorParams:
+    """Параметры курсорной пагинации"""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="next_cursor предыдущей страницы"),
+        size: int = Query(50, ge=1, le=100),
+    ):
+        self.cursor = cursor
+        self.size = size
+
+
+class PageParams(Params):
+    """Номер и размер страницы, with_total=false отключает подсчёт total"""
+
+    with_total: bool = Query(True, description="false - только has_next, без total")
+
+    @property
+    def offset(self) -> int:
+        return (self.page - 1) * self.size
+
+
+def count_strategy(endpoint: str, params: PageParams) -> str:
+    if not params.with_total:
+        return "none"
+    return settings.pagination_count_strategies.get(endpoint, "exact")
+
+
+def make_page(items: list, params: PageParams, total: int | None) -> OffsetPage:
+    """
+    Страница из size + 1 записей: лишняя запись только показывает, что
+    есть следующая страница.
+    """
+    return OffsetPage(
+        items=items[: params.size],
+        total=total,
+        page=params.page,
+        size=params.size,
+        pages=math.ceil(total / params.size) if total is not None else None,
+        has_next=len(items) > params.size,
+    )
@@ -0,0 +1,136 @@
+import ipaddress
+import logging
+import math
+from http import HTTPStatus
+
+from fastapi import Depends, HTTPException, Request
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+
+from core.config import settings
+from db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Token bucket на несколько ключей сразу. Запрос проходит, только если
+# во всех корзинах есть токен, иначе ничего не списывается.
+# KEYS: корзины; ARGV: ёмкость, скорость пополнения (токенов в мс).
+# Возвращает 0 или сколько мс ждать до следующей попытки.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, math.ceil((1 - tokens) / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+local ttl = math.ceil(capacity / rate)
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', now)
+    redis.call('PEXPIRE', key, ttl)
+end
+return 0
+"""
+
+# Скрипт не привязан к клиенту: sha считается один раз, а при первом
+# вызове на сервере Redis скрипт загружается через SCRIPT LOAD
+token_bucket_script = AsyncScript(None, TOKEN_BUCKET_SCRIPT.encode())
+
+
+def parse_limit(limit: str) -> tuple[int, int]:
+    """Лимит в формате "<запросов>/<секунд>" """
+    requests, seconds = limit.split("/")
+    return int(requests), int(seconds)
+
+
+async def acquire(redis: Redis, keys: list[str], capacity: int, period: int) -> int:
+    """Списывает по токену из каждой корзины. Возвращает 0 или задержку в мс"""
+    return await token_bucket_script(
+        keys=keys, args=[capacity, capacity / (period * 1000)], client=redis
+    )
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in settings.trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Адрес клиента. Если запрос пришёл от доверенного прокси, берётся
+    крайний справа адрес из X-Forwarded-For (или X-Real-IP), который не
+    принадлежит доверенным прокси. Адреса левее могут быть подделаны клиентом.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = request.headers.get("x-forwarded-for") or request.headers.get(
+        "x-real-ip", ""
+    )
+    addresses = [address.strip() for address in forwarded.split(",")]
+    addresses = [address for address in addresses if address]
+    for address in reversed(addresses):
+        if not _is_trusted_proxy(address):
+            return address
+    return addresses[0] if addresses else peer
+
+
+class RateLimit:
+    """
+    Зависимость FastAPI, ограничивающая частоту запросов к маршруту по IP
+    клиента (см. client_ip) и, если by_login, по полю login из тела запроса. Лимиты берутся
+    из settings.rate_limits по имени маршрута. Проверка выполняется до
+    обработчика, поэтому отклонённый запрос не доходит до БД и хеширования.
+    """
+
+    def __init__(self, route: str, by_login: bool = False):
+        self.route = route
+        self.by_login = by_login
+        self.capacity, self.period = parse_limit(settings.rate_limits[route])
+
+    async def _keys(self, request: Request) -> list[str]:
+        keys = [f"rate_limit:{self.route}:ip:{client_ip(request)}"]
+        if self.by_login:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            if isinstance(body, dict) and isinstance(body.get("login"), str):
+                keys.append(f"rate_limit:{self.route}:login:{body['login']}")
+        return keys
+
+    async def __call__(self, request: Request, redis: Redis = Depends(get_redis)):
+        if not settings.rate_limit_enabled:
+            return
+
+        keys = await self._keys(request)
+        try:
+            wait_ms = await acquire(redis, keys, self.capacity, self.period)
+        except RedisError:
+            # Недоступность Redis не должна блокировать вход
+            logger.exception("Rate limit check failed for %s", self.route)
+            return
+
+        if wait_ms:
+            raise HTTPException(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                detail="too many requests",
+                headers={"Retry-After": str(math.ceil(wait_ms / 1000))},
+            )
@@ -1,13 +1,16 @@
 from http import HTTPStatus
-from typing import Annotated, Union
+from typing import Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi_pagination import Page, Params, paginate
 
-from api.auth_utils import (check_admin, check_allow_affect_user, decode_token,
-                            oauth2_scheme)
-from schemas.roles import RoleSchema, RoleUpdateSchema
+from api.auth_utils import Require
+from api.pagination import (CursorParams, PageParams, decode_time_cursor,
+                            encode_cursor, make_page)
+from schemas.pagination import CursorPage, OffsetPage
+from schemas.roles import (RoleSchema, RoleUpdateSchema, UsersRolesInputSchema,
+                           UsersRolesSchema)
+from schemas.users import UserListFilterSchema, UserListItemSchema, UserSchema
 from services.admin import AdminService, get_admin_service
 from services.auth import AuthService, get_auth_service
 from services.exceptions import (ConflictError, ObjectNotFoundError,
@@ -15,10 +18,71 @@ from services.exceptions import (ConflictError, ObjectNotFoundError,
 
 router = APIRouter()
 
+admin_only = Require(roles={"admin"})
+admin_or_self = Require(roles={"admin"}, self_param="user_id")
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(admin_only)],
+    response_model=CursorPage[UserListItemSchema],
+    summary="Список пользователей",
+    response_description="Страница пользователей с ролями и курсор следующей страницы",
+    responses={
+        HTTPStatus.BAD_REQUEST: {
+            "description": "Некорректный курсор",
+            "content": {"application/json": {"example": {"detail": "invalid cursor"}}},
+        },
+        HTTPStatus.UNAUTHORIZED: {
+            "description": "Ошибка валидации токена",
+            "content": {"application/json": {"example": {"detail": "invalid token"}}},
+        },
+        HTTPStatus.FORBIDDEN: {
+            "description": "Доступ запрещен",
+            "content": {"application/json": {"example": {"detail": "Forbidden"}}},
+        },
+    },
+)
+async def list_users(
+    filters: UserListFilterSchema = Depends(),
+    params: CursorParams = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    after = None
+    if params.cursor:
+        try:
+            after = decode_time_cursor(params.cursor)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail="invalid cursor"
+            )
+
+    users = await admin_service.list_users(filters, params.size + 1, after=after)
+    next_cursor = None
+    if len(users) > params.size:
+        users = users[: params.size]
+        last = users[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+
+    # Роли всей страницы загружаются одним запросом
+    roles = await admin_service.roles_loader().load_many([user.id for user in users])
+    return CursorPage[UserListItemSchema](
+        items=[
+            UserListItemSchema(
+                **UserSchema.model_validate(user).model_dump(),
+                created_at=user.created_at,
+                roles=user_roles,
+            )
+            for user, user_roles in zip(users, roles)
+        ],
+        next_cursor=next_cursor,
+    )
+
 
 @router.get(
     "/{user_id}/roles",
-    response_model=Union[Page[RoleSchema], list],
+    dependencies=[Depends(admin_or_self)],
+    response_model=Union[OffsetPage[RoleSchema], list],
     summary="Информация по ролям пользователя",
     response_description="Информация по ролям пользователя",
     responses={
@@ -38,23 +102,17 @@ router = APIRouter()
 )
 async def get_user_roles(
     user_id: UUID,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-    auth_service: AuthService = Depends(get_auth_service),
     admin_service: AdminService = Depends(get_admin_service),
-    params: Params = Depends(),
-) -> Union[Page[RoleSchema], list]:
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
-    check_allow_affect_user(payload, user_id)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
+    params: PageParams = Depends(),
+) -> Union[OffsetPage[RoleSchema], list]:
     try:
-        roles = await admin_service.get_user_roles(user_id)
-        return paginate(roles, params)
+        roles, total = await admin_service.get_user_roles(
+            user_id,
+            params.size + 1,
+            offset=params.offset,
+            with_total=params.with_total,
+        )
+        return make_page(roles, params, total)
     except ObjectNotFoundError:
         return []
     except UserNotFoundError:
@@ -63,8 +121,38 @@ async def get_user_roles(
         )
 
 
+@router.post(
+    "/roles/batch",
+    dependencies=[Depends(admin_only)],
+    response_model=UsersRolesSchema,
+    summary="Роли нескольких пользователей",
+    response_description="Роли каждого найденного пользователя и ненайденные id",
+    responses={
+        HTTPStatus.UNAUTHORIZED: {
+            "description": "Ошибка валидации токена",
+            "content": {"application/json": {"example": {"detail": "invalid token"}}},
+        },
+        HTTPStatus.FORBIDDEN: {
+            "description": "Доступ запрещен",
+            "content": {"application/json": {"example": {"detail": "Forbidden"}}},
+        },
+    },
+)
+async def get_users_roles(
+    request_data: UsersRolesInputSchema,
+    admin_service: AdminService = Depends(get_admin_service),
+) -> UsersRolesSchema:
+    user_ids = list(dict.fromkeys(request_data.user_ids))
+    roles = await admin_service.get_users_roles(user_ids)
+    return {
+        "roles": roles,
+        "not_found": [user_id for user_id in user_ids if user_id not in roles],
+    }
+
+
 @router.post(
     "/{user_id}/roles",
+    dependencies=[Depends(admin_only)],
     response_model=RoleSchema,
     summary="Добавление новой роли пользователю",
     response_description="Информация по добавленной роли пользователю",
@@ -86,23 +174,12 @@ async def get_user_roles(
 async def add_user_role(
     user_id: UUID,
     request_data: RoleUpdateSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
     auth_service: AuthService = Depends(get_auth_service),
     admin_service: AdminService = Depends(get_admin_service),
 ) -> RoleSchema:
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
-    check_admin(payload)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
     try:
         role_id = request_data.role_id
         role = await admin_service.add_user_role(user_id, role_id)
-        return role
     except ObjectNotFoundError:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="role not found")
     except UserNotFoundError:
@@ -114,9 +191,14 @@ async def add_user_role(
             status_code=HTTPStatus.CONFLICT, detail="user already has this role"
         )
 
+    # Токены с устаревшим списком ролей больше не принимаются
+    await auth_service.revoke_user_tokens(user_id)
+    return role
+
 
 @router.delete(
     "/{user_id}/roles/{role_id}",
+    dependencies=[Depends(admin_only)],
     response_model=RoleSchema,
     summary="Удаление роли у пользователя",
     response_description="Информация по удалённой роли пользователю",
@@ -138,25 +220,17 @@ async def add_user_role(
 async def remove_user_role(
     user_id: UUID,
     role_id: UUID,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
     auth_service: AuthService = Depends(get_auth_service),
     admin_service: AdminService = Depends(get_admin_service),
 ) -> RoleUpdateSchema:
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
-    check_admin(payload)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
     try:
         role = await admin_service.remove_user_role(user_id, role_id)
-        return role
     except ObjectNotFoundError:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="role not found")
     except UserNotFoundError:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="user does not exist"
         )
+
+    await auth_service.revoke_user_tokens(user_id)
+    return role
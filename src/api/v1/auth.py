@@ -2,19 +2,26 @@ from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from api.auth_utils import decode_token
-from schemas.auths import (AuthOutputSchema, LoginInputSchema,
-                           RefreshInputSchema)
+from api.auth_utils import Require, decode_token
+from api.rate_limit import RateLimit
+from core.config import settings
+from schemas.auths import (AuthOutputSchema, IntrospectInputSchema,
+                           IntrospectOutputSchema, LoginInputSchema,
+                           RefreshInputSchema, TokenIntrospectionSchema)
 from schemas.users import CreateUserSchema
 from services.auth import AuthService, get_auth_service
-from services.exceptions import ConflictError, ObjectNotFoundError
+from services.exceptions import (ConflictError, InvalidCredentialsError,
+                                 ObjectNotFoundError)
 from services.user import UserService, get_user_service
 
 router = APIRouter()
 
+internal_service = Require(roles=settings.internal_service_roles)
+
 
 @router.post(
     "/signup",
+    dependencies=[Depends(RateLimit("signup"))],
     response_model=AuthOutputSchema,
     summary="Регистрация пользователя",
     response_description="Пара токенов: access, refresh",
@@ -27,6 +34,12 @@ router = APIRouter()
                 }
             },
         },
+        HTTPStatus.TOO_MANY_REQUESTS: {
+            "description": "Превышен лимит запросов",
+            "content": {
+                "application/json": {"example": {"detail": "too many requests"}}
+            },
+        },
     },
 )
 async def signup(
@@ -43,7 +56,7 @@ async def signup(
         )
 
     user_id = str(user.id)
-    user_roles = [x.title for x in await user_service.get_user_roles(user_id)]
+    user_roles = await user_service.get_user_role_titles(user_id)
 
     access_token = await auth_service.generate_access_token(user_id, user_roles)
     refresh_token = await auth_service.emit_refresh_token(user_id)
@@ -53,6 +66,7 @@ async def signup(
 
 @router.post(
     "/refresh",
+    dependencies=[Depends(RateLimit("refresh"))],
     response_model=AuthOutputSchema,
     summary="Обновление access token",
     response_description="Пара токенов: access, refresh",
@@ -65,6 +79,12 @@ async def signup(
             "description": "Доступ запрещен",
             "content": {"application/json": {"example": {"detail": "Forbidden"}}},
         },
+        HTTPStatus.TOO_MANY_REQUESTS: {
+            "description": "Превышен лимит запросов",
+            "content": {
+                "application/json": {"example": {"detail": "too many requests"}}
+            },
+        },
     },
 )
 async def refresh(
@@ -73,31 +93,32 @@ async def refresh(
     user_service: UserService = Depends(get_user_service),
 ) -> AuthOutputSchema:
 
-    refresh_token_data = decode_token(request_data.refresh_token)
-    if not refresh_token_data:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
-    if not await auth_service.is_refresh_token_valid(request_data.refresh_token):
+    user_id = await auth_service.get_refresh_token_user(request_data.refresh_token)
+    if not user_id:
         raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
 
     access_token_data = decode_token(request_data.access_token)
     if access_token_data:
-        await auth_service.invalidate_access_token(request_data.access_token)
-
-    user_id = refresh_token_data["user_id"]
+        await auth_service.invalidate_access_token(
+            request_data.access_token, access_token_data
+        )
 
-    user_roles = [x.title for x in await user_service.get_user_roles(user_id)]
-    refresh_token, access_token = await auth_service.update_refresh_token(
-        user_id,
-        request_data.refresh_token,
-        user_roles,
-    )
+    user_roles = await user_service.get_user_role_titles(user_id)
+    try:
+        refresh_token, access_token = await auth_service.update_refresh_token(
+            user_id,
+            request_data.refresh_token,
+            user_roles,
+        )
+    except ObjectNotFoundError:
+        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
 
     return AuthOutputSchema(access_token=access_token, refresh_token=refresh_token)
 
 
 @router.post(
     "/login",
+    dependencies=[Depends(RateLimit("login", by_login=True))],
     response_model=AuthOutputSchema,
     summary="Вход пользователя в аккаунт",
     response_description="Пара токенов: access, refresh",
@@ -116,30 +137,27 @@ async def refresh(
                 "application/json": {"example": {"detail": "invalid password"}}
             },
         },
+        HTTPStatus.TOO_MANY_REQUESTS: {
+            "description": "Превышен лимит запросов",
+            "content": {
+                "application/json": {"example": {"detail": "too many requests"}}
+            },
+        },
     },
 )
 async def login(
     login_data: LoginInputSchema,
     auth_service: AuthService = Depends(get_auth_service),
-    user_service: UserService = Depends(get_user_service),
 ) -> AuthOutputSchema:
     try:
-        user = await user_service.get_user_by_login(login_data.login)
+        access_token, refresh_token = await auth_service.login(
+            login_data.login, login_data.password
+        )
     except ObjectNotFoundError:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="user not found")
-
-    if not user.check_password(login_data.password):
+    except InvalidCredentialsError:
         raise HTTPException(HTTPStatus.BAD_REQUEST, detail="invalid password")
 
-    user_id = str(user.id)
-
-    await user_service.save_login_history(user_id)
-
-    user_roles = [x.title for x in await user_service.get_user_roles(user_id)]
-
-    access_token = await auth_service.generate_access_token(user_id, user_roles)
-    refresh_token = await auth_service.emit_refresh_token(user_id)
-
     return AuthOutputSchema(access_token=access_token, refresh_token=refresh_token)
 
 
@@ -159,14 +177,14 @@ async def logout(
     request_data: RefreshInputSchema,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    refresh_token_data = decode_token(request_data.refresh_token)
-    if not refresh_token_data:
+    if not await auth_service.invalidate_refresh_token(request_data.refresh_token):
         raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
 
-    await auth_service.invalidate_refresh_token(request_data.refresh_token)
-
-    if decode_token(request_data.access_token):
-        await auth_service.invalidate_access_token(request_data.access_token)
+    access_token_data = decode_token(request_data.access_token)
+    if access_token_data:
+        await auth_service.invalidate_access_token(
+            request_data.access_token, access_token_data
+        )
 
     return {"detail": "logout success"}
 
@@ -187,11 +205,57 @@ async def logout_all(
     request_data: RefreshInputSchema,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    refresh_token_data = decode_token(request_data.refresh_token)
-    if not refresh_token_data:
+    user_id = await auth_service.get_refresh_token_user(request_data.refresh_token)
+    if not user_id:
         raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
 
     await auth_service.invalidate_user_refresh_tokens(
-        refresh_token_data["user_id"], request_data.refresh_token
+        user_id, request_data.refresh_token
     )
+    # Выданные access-токены отзываются все сразу, текущее устройство
+    # получит новый по своему refresh-токену
+    await auth_service.revoke_user_tokens(user_id)
     return {"detail": "logout from all other devices success"}
+
+
+@router.post(
+    "/introspect",
+    dependencies=[Depends(RateLimit("introspect")), Depends(internal_service)],
+    response_model=IntrospectOutputSchema,
+    summary="Пакетная проверка access-токенов",
+    response_description="Статус и данные каждого токена в порядке запроса",
+    responses={
+        HTTPStatus.UNAUTHORIZED: {
+            "description": "Ошибка валидации токена",
+            "content": {"application/json": {"example": {"detail": "invalid token"}}},
+        },
+        HTTPStatus.FORBIDDEN: {
+            "description": "Доступ запрещен",
+            "content": {"application/json": {"example": {"detail": "Forbidden"}}},
+        },
+    },
+)
+async def introspect(
+    request_data: IntrospectInputSchema,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> IntrospectOutputSchema:
+    payloads = [decode_token(token) for token in request_data.tokens]
+    decoded = [i for i, payload in enumerate(payloads) if payload]
+
+    valid = await auth_service.are_access_tokens_valid(
+        [request_data.tokens[i] for i in decoded], [payloads[i] for i in decoded]
+    )
+    not_revoked = {i for i, is_valid in zip(decoded, valid) if is_valid}
+
+    results = []
+    for i, payload in enumerate(payloads):
+        if not payload:
+            results.append(TokenIntrospectionSchema(active=False, status="invalid"))
+        elif i not in not_revoked:
+            results.append(TokenIntrospectionSchema(active=False, status="revoked"))
+        else:
+            results.append(
+                TokenIntrospectionSchema(active=True, status="active", claims=payload)
+            )
+
+    return IntrospectOutputSchema(results=results)
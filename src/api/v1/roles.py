@@ -1,23 +1,23 @@
-from typing import Annotated
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi_pagination import Page, paginate
 from fastapi_pagination.utils import disable_installed_extensions_check
 
-from api.auth_utils import check_admin, decode_token, oauth2_scheme
+from api.auth_utils import Require
 from schemas.roles import RoleCreateSchema, RoleSchema
-from services.auth import AuthService, get_auth_service
 from services.exceptions import (ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
 from services.role import RoleService, get_role_service
 
 router = APIRouter()
 
+admin_only = Require(roles={"admin"})
+
 disable_installed_extensions_check()
 
 
 @router.get(
     "/",
+    dependencies=[Depends(admin_only)],
     response_model=Page[RoleSchema],
     summary="Список ролей",
     response_description="Список ролей",
@@ -48,30 +48,16 @@ disable_installed_extensions_check()
     },
 )
 async def roles(
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-    auth_service: AuthService = Depends(get_auth_service),
     role_service: RoleService = Depends(get_role_service),
 ) -> Page[RoleSchema]:
 
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
-    check_admin(payload)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
     roles_list = await role_service.get_roles_list()
     return paginate(roles_list)
 
 
 @router.post(
     "/",
+    dependencies=[Depends(admin_only)],
     response_model=RoleCreateSchema,
     summary="Создание новой роли",
     response_description="Подтверждение создания роли",
@@ -110,24 +96,9 @@ async def roles(
 )
 async def create_roles(
     role: RoleCreateSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-    auth_service: AuthService = Depends(get_auth_service),
     role_service: RoleService = Depends(get_role_service),
 ) -> RoleSchema:
 
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
-    check_admin(payload)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
     try:
         new_role = await role_service.create_role(role)
         return new_role
@@ -140,6 +111,7 @@ async def create_roles(
 
 @router.delete(
     "/{role_id}",
+    dependencies=[Depends(admin_only)],
     summary="Удаление роли",
     response_description="Удаление роли по ee id",
     responses={
@@ -167,24 +139,9 @@ async def create_roles(
 )
 async def delete_roles(
     role_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-    auth_service: AuthService = Depends(get_auth_service),
     role_service: RoleService = Depends(get_role_service),
 ) -> dict:
 
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
-    check_admin(payload)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
     try:
         await role_service.delete_role(role_id)
         return {"detail": "Role deleted successfully"}
@@ -197,6 +154,7 @@ async def delete_roles(
 
 @router.put(
     "/{role_id}",
+    dependencies=[Depends(admin_only)],
     response_model=RoleCreateSchema,
     summary="Обновление роли",
     response_description="Обновление роли по ee id",
@@ -213,6 +171,14 @@ async def delete_roles(
             "description": "Доступ запрещен",
             "content": {"application/json": {"example": {"detail": "Forbidden"}}},
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Конфликт с существующей ролью.",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Role with title admin already exists."}
+                }
+            },
+        },
         status.HTTP_404_NOT_FOUND: {
             "description": "Отсутствие id у роли.",
             "content": {"application/json": {"example": {"detail": "Role not found."}}},
@@ -222,24 +188,9 @@ async def delete_roles(
 async def update_roles(
     role_id: str,
     role: RoleSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-    auth_service: AuthService = Depends(get_auth_service),
     role_service: RoleService = Depends(get_role_service),
 ) -> RoleSchema:
 
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
-    check_admin(payload)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
-        )
-
     try:
         updated_role = await role_service.change_role(role, role_id)
         return updated_role
@@ -248,3 +199,8 @@ async def update_roles(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Role not found.",
         )
+    except ObjectAlreadyExistsException:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Role with title {role.title} already exists",
+        )
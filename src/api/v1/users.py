@@ -1,21 +1,57 @@
 from http import HTTPStatus
-from typing import Annotated
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi_pagination import Page, paginate
 
-from api.auth_utils import check_allow_affect_user, decode_token, oauth2_scheme
-from schemas.users import UpdateUserSchema, UserLoginHistorySchema, UserSchema
-from services.auth import AuthService, get_auth_service
+from api.auth_utils import Require
+from api.pagination import (CursorParams, PageParams, count_strategy,
+                            decode_time_cursor, encode_cursor, make_page)
+from core.config import settings
+from schemas.pagination import CursorPage, OffsetPage
+from schemas.users import (UpdateUserSchema, UserLoginHistorySchema,
+                           UserSchema, UsersInputSchema, UsersSchema)
 from services.exceptions import ConflictError, ObjectNotFoundError
 from services.user import UserService, get_user_service
 
 router = APIRouter()
 
+internal_service = Require(roles=settings.internal_service_roles)
+admin_or_self = Require(roles={"admin"}, self_param="user_id")
+
+
+@router.post(
+    "/batch",
+    dependencies=[Depends(internal_service)],
+    response_model=UsersSchema,
+    summary="Информация о нескольких пользователях",
+    response_description="Найденные пользователи и ненайденные id",
+    responses={
+        HTTPStatus.UNAUTHORIZED: {
+            "description": "Ошибка валидации токена",
+            "content": {"application/json": {"example": {"detail": "invalid token"}}},
+        },
+        HTTPStatus.FORBIDDEN: {
+            "description": "Доступ запрещен",
+            "content": {"application/json": {"example": {"detail": "Forbidden"}}},
+        },
+    },
+)
+async def get_users_info(
+    request_data: UsersInputSchema,
+    user_service: UserService = Depends(get_user_service),
+) -> UsersSchema:
+    user_ids = list(dict.fromkeys(request_data.user_ids))
+    users = {user.id: user for user in await user_service.get_users_by_ids(user_ids)}
+    # Пользователи возвращаются в порядке запроса
+    return {
+        "users": [users[user_id] for user_id in user_ids if user_id in users],
+        "not_found": [user_id for user_id in user_ids if user_id not in users],
+    }
+
 
 @router.get(
     "/{user_id}",
+    dependencies=[Depends(admin_or_self)],
     response_model=UserSchema,
     summary="Информация о пользователе",
     response_description="Полная информация о пользователе",
@@ -36,20 +72,8 @@ router = APIRouter()
 )
 async def get_user_info(
     user_id: UUID,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
     user_service: UserService = Depends(get_user_service),
-    auth_service: AuthService = Depends(get_auth_service),
 ):
-
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
-    check_allow_affect_user(payload, user_id)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
     try:
         user = await user_service.get_user_by_id(user_id)
     except ObjectNotFoundError:
@@ -60,7 +84,8 @@ async def get_user_info(
 
 @router.get(
     "/{user_id}/login_history",
-    response_model=Page[UserLoginHistorySchema],
+    dependencies=[Depends(admin_or_self)],
+    response_model=OffsetPage[UserLoginHistorySchema],
     summary="Информация об истории логинов пользователя",
     response_description="Список всех логинов пользователя с пагинацией",
     responses={
@@ -80,29 +105,83 @@ async def get_user_info(
 )
 async def get_user_history(
     user_id: UUID,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    params: PageParams = Depends(),
     user_service: UserService = Depends(get_user_service),
-    auth_service: AuthService = Depends(get_auth_service),
 ):
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
+    try:
+        user_history = await user_service.get_user_history(
+            user_id, params.size + 1, offset=params.offset
+        )
+    except ObjectNotFoundError:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="user not found")
 
-    check_allow_affect_user(payload, user_id)
+    total = await user_service.count_user_history(
+        user_id, count_strategy("login_history", params)
+    )
+    return make_page(user_history, params, total)
 
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
+
+@router.get(
+    "/{user_id}/login_history/cursor",
+    dependencies=[Depends(admin_or_self)],
+    response_model=CursorPage[UserLoginHistorySchema],
+    summary="История логинов пользователя по курсору",
+    response_description="Страница истории логинов и курсор следующей страницы",
+    responses={
+        HTTPStatus.BAD_REQUEST: {
+            "description": "Некорректный курсор",
+            "content": {"application/json": {"example": {"detail": "invalid cursor"}}},
+        },
+        HTTPStatus.NOT_FOUND: {
+            "description": "Пользователь не найден",
+            "content": {"application/json": {"example": {"detail": "user not found"}}},
+        },
+        HTTPStatus.UNAUTHORIZED: {
+            "description": "Ошибка валидации токена",
+            "content": {"application/json": {"example": {"detail": "invalid token"}}},
+        },
+        HTTPStatus.FORBIDDEN: {
+            "description": "Доступ запрещен",
+            "content": {"application/json": {"example": {"detail": "Forbidden"}}},
+        },
+    },
+)
+async def get_user_history_by_cursor(
+    user_id: UUID,
+    params: CursorParams = Depends(),
+    user_service: UserService = Depends(get_user_service),
+):
+    after = None
+    if params.cursor:
+        try:
+            after = decode_time_cursor(params.cursor)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail="invalid cursor"
+            )
 
     try:
-        user_history = await user_service.get_user_history(user_id)
+        # Лишняя запись показывает, есть ли следующая страница
+        user_history = await user_service.get_user_history(
+            user_id, params.size + 1, after=after
+        )
     except ObjectNotFoundError:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="user not found")
 
-    return paginate(user_history)
+    next_cursor = None
+    if len(user_history) > params.size:
+        user_history = user_history[: params.size]
+        last = user_history[-1]
+        next_cursor = encode_cursor(last.event_date.isoformat(), last.id)
+
+    return CursorPage[UserLoginHistorySchema](
+        items=user_history, next_cursor=next_cursor
+    )
 
 
 @router.put(
     "/{user_id}",
+    dependencies=[Depends(admin_or_self)],
     response_model=UpdateUserSchema,
     summary="Изменения данных пользователя",
     response_description="Актуальная информация о пользователе",
@@ -132,19 +211,8 @@ async def get_user_history(
 async def put_user_info(
     user_id: UUID,
     request_data: UpdateUserSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
     user_service: UserService = Depends(get_user_service),
-    auth_service: AuthService = Depends(get_auth_service),
 ):
-    payload = decode_token(access_token)
-    if not payload:
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
-    check_allow_affect_user(payload, user_id)
-
-    if not await auth_service.is_access_token_valid(access_token):
-        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
-
     try:
         user = await user_service.update_user(user_id, request_data)
     except ObjectNotFoundError:
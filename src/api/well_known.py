@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from core.config import settings
+from utils.jwt_keys import get_jwt_keyring
+
+router = APIRouter()
+
+
+@router.get(
+    "/jwks.json",
+    summary="Публичные ключи для проверки токенов",
+    response_description="JWK Set активного и предыдущих ключей подписи",
+)
+async def jwks(response: Response) -> dict:
+    response.headers["Cache-Control"] = f"public, max-age={settings.jwks_cache_max_age}"
+    return get_jwt_keyring().jwks()
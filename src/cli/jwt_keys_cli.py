@@ -0,0 +1,80 @@
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import typer
+
+sys.path.append("..")
+
+from core.config import settings
+from utils.jwt_keys import (JWTKeyring, expired_kids, generate_private_key,
+                            read_activations, record_activation)
+
+app = typer.Typer()
+
+
+@app.command()
+def generate(kid: str = typer.Option(None, help="Идентификатор ключа")):
+    """Создаёт новый ключ подписи в JWT_KEYS_DIR"""
+    kid = kid or date.today().isoformat()
+    keys_dir = Path(settings.jwt_keys_dir)
+    keys_dir.mkdir(parents=True, exist_ok=True)
+
+    path = keys_dir / f"{kid}.pem"
+    if path.exists():
+        typer.echo(f"Key {kid} already exists.")
+        raise typer.Exit(code=1)
+
+    path.write_bytes(generate_private_key(settings.jwt_algorithm))
+    path.chmod(0o600)
+    typer.echo(f"Key {kid} created.")
+
+
+@app.command()
+def activate(kid: str = typer.Argument(..., help="Идентификатор ключа")):
+    """
+    Записывает время активации ключа. Запускается, когда все экземпляры
+    сервиса перезапущены с JWT_ACTIVE_KID=<kid>: с этого момента предыдущий
+    ключ больше не подписывает токены
+    """
+    keys_dir = Path(settings.jwt_keys_dir)
+    if not (keys_dir / f"{kid}.pem").exists():
+        typer.echo(f"Key {kid} not found.")
+        raise typer.Exit(code=1)
+
+    record_activation(keys_dir, kid, time.time())
+    typer.echo(f"Key {kid} activation recorded.")
+
+
+@app.command()
+def prune():
+    """
+    Удаляет ключи, замененные следующим активированным ключом раньше, чем
+    истёк максимальный срок жизни подписанных ими токенов
+    """
+    keys_dir = Path(settings.jwt_keys_dir)
+    activations = read_activations(keys_dir)
+    active_kid = JWTKeyring(
+        settings.jwt_algorithm,
+        settings.jwt_secret_key,
+        settings.jwt_keys_dir,
+        settings.jwt_active_kid,
+    ).kid
+    if not activations or activations[-1]["kid"] != active_kid:
+        typer.echo(f"Activation of key {active_kid} is not recorded, run activate.")
+        raise typer.Exit(code=1)
+
+    max_token_age = max(
+        settings.access_token_exp_hours * 3600,
+        settings.refresh_token_exp_days * 86400,
+    )
+    for kid in expired_kids(activations, max_token_age, time.time()):
+        path = keys_dir / f"{kid}.pem"
+        if kid != active_kid and path.exists():
+            path.unlink()
+            typer.echo(f"Key {kid} removed.")
+
+
+if __name__ == "__main__":
+    app()
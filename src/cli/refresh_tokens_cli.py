@@ -0,0 +1,24 @@
+import asyncio
+import sys
+
+import typer
+
+sys.path.append("..")
+
+from core.config import settings
+from utils.refresh_token_reaper import reap_expired_refresh_tokens
+
+app = typer.Typer()
+
+
+@app.command()
+def reap(
+    batch_size: int = settings.refresh_token_reaper_batch_size,
+    pause_ms: int = settings.refresh_token_reaper_pause_ms,
+):
+    removed = asyncio.run(reap_expired_refresh_tokens(batch_size, pause_ms / 1000))
+    typer.echo(f"Removed {removed} expired refresh tokens.")
+
+
+if __name__ == "__main__":
+    app()
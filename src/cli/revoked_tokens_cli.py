@@ -0,0 +1,36 @@
+import asyncio
+import sys
+
+import typer
+from redis.asyncio import Redis
+
+sys.path.append("..")
+
+from core.config import settings
+from db.token_denylist import TokenDenylist
+
+app = typer.Typer()
+
+
+async def get_memory_report() -> dict[str, int]:
+    redis = Redis(host=settings.redis_host, port=settings.redis_port)
+    try:
+        denylist = TokenDenylist(redis, settings.revoked_token_bucket_seconds)
+        return await denylist.memory_report()
+    finally:
+        await redis.aclose()
+
+
+@app.command()
+def report():
+    """Память, занимаемая списком отозванных access-токенов"""
+    memory_report = asyncio.run(get_memory_report())
+    typer.echo(
+        f"{memory_report['entries']} revoked tokens in {memory_report['keys']} keys, "
+        f"{memory_report['bytes']} bytes "
+        f"({memory_report['bytes_per_entry']} bytes per token)."
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,25 @@
+import asyncio
+import sys
+
+import typer
+
+sys.path.append("..")
+
+from utils.role_titles import check_role_titles
+
+app = typer.Typer()
+
+
+@app.command()
+def check(batch_size: int = 1000, fix: bool = False):
+    stale = asyncio.run(check_role_titles(batch_size, fix))
+    for user_id in stale:
+        typer.echo(user_id)
+    action = "Fixed" if fix else "Found"
+    typer.echo(f"{action} {len(stale)} users with stale role titles.")
+    if stale and not fix:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
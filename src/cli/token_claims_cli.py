@@ -0,0 +1,57 @@
+import secrets
+import sys
+import time
+import uuid
+
+import typer
+
+sys.path.append("..")
+
+from db import role_catalog
+from db.role_catalog import CatalogRole, RoleCatalog, RoleSnapshot
+from utils.jwt_keys import get_jwt_keyring
+from utils.token_claims import pack_access_claims, unpack_access_claims
+
+app = typer.Typer()
+
+
+def measure(payload: dict, iterations: int) -> tuple[int, float]:
+    """Размер токена в байтах и среднее время разбора в микросекундах"""
+    keyring = get_jwt_keyring()
+    token = keyring.encode(payload)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        unpack_access_claims(keyring.decode(token))
+    elapsed = time.perf_counter() - started
+    return len(token), elapsed / iterations * 1_000_000
+
+
+@app.command()
+def bench(roles: int = 3, iterations: int = 10000):
+    """Сравнение полного и компактного формата access-токена"""
+    titles = [f"role_{i}" for i in range(roles)]
+    catalog = RoleCatalog(None, None, poll_seconds=0)
+    catalog.snapshot = RoleSnapshot.build(
+        0,
+        [
+            CatalogRole(id=uuid.uuid4(), code=code, title=title)
+            for code, title in enumerate(titles, start=1)
+        ],
+    )
+    role_catalog.role_catalog = catalog
+
+    claims = {
+        "user_id": str(uuid.uuid4()),
+        "exp": int(time.time()) + 3600,
+        "roles": titles,
+        "epoch": 1,
+        "jti": secrets.token_urlsafe(8),
+        "typ": "access",
+    }
+    for name, payload in (("full", claims), ("compact", pack_access_claims(claims))):
+        size, decode_us = measure(payload, iterations)
+        typer.echo(f"{name:>8}: {size} bytes, {decode_us:.1f} us to decode")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,20 @@
+import asyncio
+import sys
+
+import typer
+
+sys.path.append("..")
+
+from utils.user_roles_warmup import warm_user_roles_cache
+
+app = typer.Typer()
+
+
+@app.command()
+def warm(batch_size: int = 1000):
+    warmed = asyncio.run(warm_user_roles_cache(batch_size))
+    typer.echo(f"Cached roles of {warmed} users.")
+
+
+if __name__ == "__main__":
+    app()
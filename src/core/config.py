@@ -1,7 +1,15 @@
-from pydantic import Field
+from typing import Literal
+
+from pydantic import Field, IPvAnyNetwork, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-JWT_ALGORITHM = "HS256"
+# Лимиты маршрутов в формате "<запросов>/<секунд>"
+DEFAULT_RATE_LIMITS = {
+    "login": "10/60",
+    "signup": "5/60",
+    "refresh": "30/60",
+    "introspect": "600/60",
+}
 
 
 class Settings(BaseSettings):
@@ -23,9 +31,97 @@ class Settings(BaseSettings):
     redis_port: int = Field(6379, alias="REDIS_PORT")
 
     jwt_secret_key: str = Field("my_secret_key", alias="JWT_SECRET_KEY")
+    jwt_algorithm: Literal["HS256", "RS256", "EdDSA"] = Field(
+        "HS256", alias="JWT_ALGORITHM"
+    )
+    jwt_keys_dir: str = Field("keys", alias="JWT_KEYS_DIR")
+    jwt_active_kid: str | None = Field(None, alias="JWT_ACTIVE_KID")
+    jwks_cache_max_age: int = Field(86400, alias="JWKS_CACHE_MAX_AGE")
+    introspect_max_tokens: int = Field(100, alias="INTROSPECT_MAX_TOKENS")
+    users_batch_max_ids: int = Field(100, alias="USERS_BATCH_MAX_IDS")
+    internal_service_roles: list[str] = Field(
+        ["service"], alias="INTERNAL_SERVICE_ROLES"
+    )
     access_token_exp_hours: int = Field(1, alias="ACCESS_TOKEN_EXP_HOURS")
+    access_token_format: Literal["full", "compact"] = Field(
+        "full", alias="ACCESS_TOKEN_FORMAT"
+    )
     refresh_token_exp_days: int = Field(10, alias="REFRESH_TOKEN_EXP_DAYS")
+    refresh_token_format: Literal["jwt", "opaque"] = Field(
+        "jwt", alias="REFRESH_TOKEN_FORMAT"
+    )
+    refresh_token_store: Literal["postgres", "redis"] = Field(
+        "postgres", alias="REFRESH_TOKEN_STORE"
+    )
     engine_echo: bool = Field(False, alias="ENGINE_ECHO")
 
+    refresh_token_reaper_enabled: bool = Field(
+        True, alias="REFRESH_TOKEN_REAPER_ENABLED"
+    )
+    refresh_token_reaper_interval_seconds: int = Field(
+        3600, alias="REFRESH_TOKEN_REAPER_INTERVAL_SECONDS"
+    )
+    refresh_token_reaper_batch_size: int = Field(
+        1000, alias="REFRESH_TOKEN_REAPER_BATCH_SIZE"
+    )
+    refresh_token_reaper_pause_ms: int = Field(
+        100, alias="REFRESH_TOKEN_REAPER_PAUSE_MS"
+    )
+
+    decoded_token_cache_enabled: bool = Field(
+        True, alias="DECODED_TOKEN_CACHE_ENABLED"
+    )
+    decoded_token_cache_size: int = Field(10_000, alias="DECODED_TOKEN_CACHE_SIZE")
+
+    token_epoch_cache_seconds: float = Field(5, alias="TOKEN_EPOCH_CACHE_SECONDS")
+    token_epoch_cache_size: int = Field(10_000, alias="TOKEN_EPOCH_CACHE_SIZE")
+
+    # 0 - отдельный ключ на каждый отозванный токен
+    revoked_token_bucket_seconds: int = Field(
+        0, alias="REVOKED_TOKEN_BUCKET_SECONDS"
+    )
+
+    role_catalog_enabled: bool = Field(True, alias="ROLE_CATALOG_ENABLED")
+    role_catalog_poll_seconds: float = Field(5, alias="ROLE_CATALOG_POLL_SECONDS")
+
+    user_roles_cache_enabled: bool = Field(True, alias="USER_ROLES_CACHE_ENABLED")
+    user_roles_cache_ttl: int = Field(3600, alias="USER_ROLES_CACHE_TTL")
+
+    password_hash_workers: int = Field(2, alias="PASSWORD_HASH_WORKERS")
+
+    login_history_batch_size: int = Field(100, alias="LOGIN_HISTORY_BATCH_SIZE")
+    login_history_flush_ms: int = Field(500, alias="LOGIN_HISTORY_FLUSH_MS")
+    login_history_buffer_size: int = Field(10_000, alias="LOGIN_HISTORY_BUFFER_SIZE")
+
+    token_filter_enabled: bool = Field(True, alias="TOKEN_FILTER_ENABLED")
+    token_filter_capacity: int = Field(100_000, alias="TOKEN_FILTER_CAPACITY")
+    token_filter_error_rate: float = Field(0.01, alias="TOKEN_FILTER_ERROR_RATE")
+    token_filter_max_memory_kb: int = Field(1024, alias="TOKEN_FILTER_MAX_MEMORY_KB")
+    token_filter_rebuild_seconds: int = Field(
+        600, alias="TOKEN_FILTER_REBUILD_SECONDS"
+    )
+
+    rate_limit_enabled: bool = Field(True, alias="RATE_LIMIT_ENABLED")
+    rate_limits: dict[str, str] = Field(DEFAULT_RATE_LIMITS, alias="RATE_LIMITS")
+    # Прокси, которым доверяются X-Forwarded-For и X-Real-IP
+    trusted_proxies: list[IPvAnyNetwork] = Field([], alias="TRUSTED_PROXIES")
+
+    # Подсчёт total в страницах: exact | estimated | cached | none
+    pagination_count_strategies: dict[
+        str, Literal["exact", "estimated", "cached", "none"]
+    ] = Field({"login_history": "exact"}, alias="PAGINATION_COUNT_STRATEGIES")
+    pagination_count_cache_seconds: int = Field(
+        60, alias="PAGINATION_COUNT_CACHE_SECONDS"
+    )
+
+
+    @field_validator("rate_limits")
+    @classmethod
+    def merge_rate_limits(cls, value: dict[str, str]) -> dict[str, str]:
+        # Маршруты, не указанные в RATE_LIMITS, сохраняют лимиты по умолчанию
+        return {**DEFAULT_RATE_LIMITS, **value}
+
 
 settings = Settings()
+
+JWT_ALGORITHM = settings.jwt_algorithm
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.login_history import LoginHistory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoginHistoryMetrics:
+    recorded: int = 0
+    flushed: int = 0
+    flushes: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+
+class LoginHistoryBuffer:
+    """
+    Буфер записей истории входов (успешных и неудачных). Записи копятся в
+    памяти и сбрасываются в БД одним многострочным INSERT, когда набирается
+    batch_size событий или проходит flush_interval. При переполнении буфера
+    новые события отбрасываются и учитываются в метриках.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        batch_size: int,
+        flush_interval: float,
+        max_size: int,
+    ):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.metrics = LoginHistoryMetrics()
+        self._events: list[dict[str, Any]] = []
+        self._batch_ready = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    def record(self, user_id: uuid.UUID, success: bool) -> None:
+        if len(self._events) >= self.max_size:
+            self.metrics.dropped += 1
+            return
+
+        self._events.append(
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "event_date": datetime.now(),
+                "success": success,
+            }
+        )
+        self.metrics.recorded += 1
+        if len(self._events) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> None:
+        while self._events:
+            batch = self._events[: self.batch_size]
+            del self._events[: self.batch_size]
+            try:
+                async with self.session_maker() as session:
+                    await session.execute(insert(LoginHistory).values(batch))
+                    await session.commit()
+            except Exception:
+                # Любая ошибка теряет только эту пачку, фоновый сброс продолжается
+                logger.exception("Failed to flush %s login history events", len(batch))
+                self.metrics.failed += len(batch)
+                continue
+
+            self.metrics.flushed += len(batch)
+            self.metrics.flushes += 1
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Дожидается текущего сброса и записывает остаток буфера"""
+        self._closing = True
+        self._batch_ready.set()
+        if self._task:
+            await self._task
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {**asdict(self.metrics), "pending": len(self._events)}
+
+
+login_history_buffer: LoginHistoryBuffer | None = None
+
+
+async def get_login_history_buffer() -> LoginHistoryBuffer | None:
+    return login_history_buffer
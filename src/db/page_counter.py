@@ -0,0 +1,62 @@
+from redis.asyncio import Redis
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class PageCounter:
+    """
+    Подсчёт total для страниц. exact - COUNT(*) на каждый запрос,
+    cached - тот же COUNT(*), сохранённый в Redis на cache_seconds,
+    estimated - оценка планировщика по статистике таблицы, none - без
+    подсчёта.
+    """
+
+    KEY = "page_count:{}"
+
+    def __init__(self, redis: Redis | None, cache_seconds: int):
+        self.redis = redis
+        self.cache_seconds = cache_seconds
+
+    async def count(
+        self,
+        session: AsyncSession,
+        query: Select,
+        strategy: str,
+        cache_key: str | None = None,
+    ) -> int | None:
+        if strategy == "none":
+            return None
+        if strategy == "estimated":
+            return await self.estimate(session, query)
+
+        # Без Redis или ключа cached сводится к exact
+        key = None
+        if strategy == "cached" and self.redis and cache_key:
+            key = self.KEY.format(cache_key)
+            cached = await self.redis.get(key)
+            if cached is not None:
+                return int(cached)
+
+        total = await session.scalar(select(func.count()).select_from(query.subquery()))
+        if key:
+            await self.redis.set(key, total, ex=self.cache_seconds)
+        return total
+
+    @staticmethod
+    async def estimate(session: AsyncSession, query: Select) -> int:
+        """Число строк из плана запроса, без его выполнения"""
+        connection = await session.connection()
+        # Параметры передаются драйверу отдельно: литералы, подставленные
+        # в text(), ломались бы на ":слово" и "%" внутри строк
+        compiled = query.compile(
+            dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        if compiled.positiontup is not None:
+            params = tuple(compiled.params[name] for name in compiled.positiontup)
+        else:
+            params = compiled.params
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", params
+        )
+        plan = result.scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,218 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import delete, select
+
+from models.refresh_token import RefreshToken
+
+# KEYS: старый токен, новый токен, множество токенов пользователя
+# ARGV: user_id, хеш старого токена, хеш нового токена, TTL нового токена
+ROTATE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[3], ARGV[2])
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[4])
+redis.call('SADD', KEYS[3], ARGV[3])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+return 1
+"""
+
+
+class AbstractRefreshTokenStore(ABC):
+    """Хранилище refresh-токенов. Токены передаются в виде sha256-хешей"""
+
+    @abstractmethod
+    async def save(
+        self,
+        user_id: str,
+        token_hash: str,
+        expires_at: datetime,
+        session: AsyncSession | None = None,
+    ) -> None:
+        """
+        Сохраняет токен. Если передана сессия Postgres, хранилище может
+        записать токен в её транзакцию без отдельного commit.
+        """
+
+    @abstractmethod
+    async def get_user(self, token_hash: str) -> str | None:
+        """id владельца действующего токена"""
+
+    @abstractmethod
+    async def rotate(
+        self, user_id: str, old_hash: str, new_hash: str, expires_at: datetime
+    ) -> bool:
+        """Атомарно заменяет токен новым. False, если старый уже использован"""
+
+    @abstractmethod
+    async def delete(self, token_hash: str) -> str | None:
+        """Удаляет токен и возвращает id его владельца"""
+
+    @abstractmethod
+    async def delete_user_tokens(self, user_id: str, exclude_hash: str) -> None:
+        """Удаляет все токены пользователя, кроме exclude_hash"""
+
+
+class PostgresRefreshTokenStore(AbstractRefreshTokenStore):
+    def __init__(self, postgres_session: async_sessionmaker):
+        self.postgres_session = postgres_session
+
+    async def save(
+        self,
+        user_id: str,
+        token_hash: str,
+        expires_at: datetime,
+        session: AsyncSession | None = None,
+    ) -> None:
+        token = RefreshToken(
+            user_id=user_id, token_hash=token_hash, expires_at=expires_at
+        )
+        if session is not None:
+            session.add(token)
+            return
+
+        async with self.postgres_session() as session:
+            session.add(token)
+            await session.commit()
+
+    async def get_user(self, token_hash: str) -> str | None:
+        async with self.postgres_session() as session:
+            user_id = await session.scalar(
+                select(RefreshToken.user_id).where(
+                    RefreshToken.token_hash == token_hash,
+                    RefreshToken.expires_at >= datetime.now(),
+                )
+            )
+        return str(user_id) if user_id else None
+
+    async def rotate(
+        self, user_id: str, old_hash: str, new_hash: str, expires_at: datetime
+    ) -> bool:
+        # Удаление старого и запись нового токена в одной транзакции
+        async with self.postgres_session() as session:
+            deleted = await session.scalar(
+                delete(RefreshToken)
+                .where(
+                    RefreshToken.token_hash == old_hash,
+                    RefreshToken.user_id == user_id,
+                )
+                .returning(RefreshToken.id)
+            )
+            if not deleted:
+                return False
+
+            session.add(
+                RefreshToken(
+                    user_id=user_id, token_hash=new_hash, expires_at=expires_at
+                )
+            )
+            await session.commit()
+        return True
+
+    async def delete(self, token_hash: str) -> str | None:
+        async with self.postgres_session() as session:
+            user_id = await session.scalar(
+                delete(RefreshToken)
+                .where(RefreshToken.token_hash == token_hash)
+                .returning(RefreshToken.user_id)
+            )
+            await session.commit()
+        return str(user_id) if user_id else None
+
+    async def delete_user_tokens(self, user_id: str, exclude_hash: str) -> None:
+        async with self.postgres_session() as session:
+            await session.execute(
+                delete(RefreshToken).where(
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.token_hash != exclude_hash,
+                )
+            )
+            await session.commit()
+
+
+class RedisRefreshTokenStore(AbstractRefreshTokenStore):
+    """
+    Токены хранятся в ключах refresh_token:<hash> со значением user_id и
+    TTL до истечения токена, поэтому чистка не нужна. Множество
+    user_refresh_tokens:<user_id> нужно для выхода со всех устройств и
+    может содержать хеши уже истёкших токенов.
+    """
+
+    TOKEN_KEY = "refresh_token:{}"
+    USER_KEY = "user_refresh_tokens:{}"
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._rotate = redis.register_script(ROTATE_SCRIPT)
+
+    @staticmethod
+    def _ttl(expires_at: datetime) -> int:
+        return max(int((expires_at - datetime.now()).total_seconds()), 1)
+
+    async def save(
+        self,
+        user_id: str,
+        token_hash: str,
+        expires_at: datetime,
+        session: AsyncSession | None = None,
+    ) -> None:
+        ttl = self._ttl(expires_at)
+        user_key = self.USER_KEY.format(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self.TOKEN_KEY.format(token_hash), str(user_id), ex=ttl)
+            pipe.sadd(user_key, token_hash)
+            pipe.expire(user_key, ttl)
+            await pipe.execute()
+
+    async def get_user(self, token_hash: str) -> str | None:
+        user_id = await self.redis.get(self.TOKEN_KEY.format(token_hash))
+        return user_id.decode() if user_id else None
+
+    async def rotate(
+        self, user_id: str, old_hash: str, new_hash: str, expires_at: datetime
+    ) -> bool:
+        rotated = await self._rotate(
+            keys=[
+                self.TOKEN_KEY.format(old_hash),
+                self.TOKEN_KEY.format(new_hash),
+                self.USER_KEY.format(user_id),
+            ],
+            args=[str(user_id), old_hash, new_hash, self._ttl(expires_at)],
+        )
+        return bool(rotated)
+
+    async def delete(self, token_hash: str) -> str | None:
+        user_id = await self.redis.getdel(self.TOKEN_KEY.format(token_hash))
+        if not user_id:
+            return None
+
+        user_id = user_id.decode()
+        await self.redis.srem(self.USER_KEY.format(user_id), token_hash)
+        return user_id
+
+    async def delete_user_tokens(self, user_id: str, exclude_hash: str) -> None:
+        user_key = self.USER_KEY.format(user_id)
+        token_hashes = [
+            token_hash.decode()
+            for token_hash in await self.redis.smembers(user_key)
+            if token_hash.decode() != exclude_hash
+        ]
+        if not token_hashes:
+            return
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*(self.TOKEN_KEY.format(h) for h in token_hashes))
+            pipe.srem(user_key, *token_hashes)
+            await pipe.execute()
+
+
+def create_refresh_token_store(
+    store: str, postgres_session: async_sessionmaker, redis: Redis
+) -> AbstractRefreshTokenStore:
+    if store == "redis":
+        return RedisRefreshTokenStore(redis)
+    return PostgresRefreshTokenStore(postgres_session)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.roles import Role
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogRole:
+    id: uuid.UUID
+    code: int
+    title: str
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    version: int
+    roles: tuple[CatalogRole, ...]
+    by_id: MappingProxyType
+    by_title: MappingProxyType
+    by_code: MappingProxyType
+
+    @classmethod
+    def build(cls, version: int, roles: list[CatalogRole]) -> "RoleSnapshot":
+        return cls(
+            version=version,
+            roles=tuple(roles),
+            by_id=MappingProxyType({role.id: role for role in roles}),
+            by_title=MappingProxyType({role.title: role for role in roles}),
+            by_code=MappingProxyType({role.code: role for role in roles}),
+        )
+
+
+class RoleCatalog:
+    """
+    Неизменяемый снимок таблицы ролей в памяти воркера. После изменения
+    ролей увеличивается счётчик версии в Redis, воркеры опрашивают его раз
+    в poll_seconds и перечитывают таблицу, только если версия сменилась.
+    """
+
+    VERSION_KEY = "role_catalog_version"
+
+    def __init__(
+        self, session_maker: async_sessionmaker, redis: Redis, poll_seconds: float
+    ):
+        self.session_maker = session_maker
+        self.redis = redis
+        self.poll_seconds = poll_seconds
+        self.snapshot: RoleSnapshot | None = None
+
+    async def _version(self) -> int:
+        return int(await self.redis.get(self.VERSION_KEY) or 0)
+
+    async def load(self, version: int | None = None) -> RoleSnapshot:
+        # Версия читается до таблицы: изменение между ними вызовет повторную загрузку
+        if version is None:
+            version = await self._version()
+        async with self.session_maker() as session:
+            rows = await session.execute(select(Role.id, Role.code, Role.title))
+        self.snapshot = RoleSnapshot.build(
+            version,
+            [CatalogRole(id=row.id, code=row.code, title=row.title) for row in rows],
+        )
+        return self.snapshot
+
+    async def refresh(self) -> None:
+        version = await self._version()
+        if self.snapshot is None or self.snapshot.version != version:
+            await self.load(version)
+
+    async def invalidate(self) -> None:
+        """Сообщает всем воркерам об изменении ролей"""
+        version = await self.redis.incr(self.VERSION_KEY)
+        await self.load(version)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.refresh()
+            except (RedisError, SQLAlchemyError):
+                logger.exception("Role catalog refresh failed")
+
+    def get(self, role_id: uuid.UUID | str) -> CatalogRole | None:
+        if not isinstance(role_id, uuid.UUID):
+            try:
+                role_id = uuid.UUID(role_id)
+            except ValueError:
+                return None
+        return self.snapshot.by_id.get(role_id)
+
+    def get_by_title(self, title: str) -> CatalogRole | None:
+        return self.snapshot.by_title.get(title)
+
+    def get_by_code(self, code: int) -> CatalogRole | None:
+        return self.snapshot.by_code.get(code)
+
+    def list(self) -> tuple[CatalogRole, ...]:
+        return self.snapshot.roles
+
+
+role_catalog: RoleCatalog | None = None
+
+
+async def get_role_catalog() -> RoleCatalog | None:
+    return role_catalog
@@ -0,0 +1,90 @@
+import hashlib
+import time
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class TokenDenylist:
+    """
+    Список отозванных access-токенов в Redis. Токен определяется коротким
+    jti, запись живёт ровно до exp токена. При bucket_seconds > 0 записи
+    хранятся не отдельными ключами, а в множествах по интервалам exp,
+    которые истекают целиком.
+    """
+
+    KEY = "revoked_token:{}"
+    BUCKET_KEY = "revoked_tokens:{}"
+
+    def __init__(self, redis: Redis, bucket_seconds: int = 0):
+        self.redis = redis
+        self.bucket_seconds = bucket_seconds
+
+    @staticmethod
+    def token_id(token: str, payload: dict[str, Any]) -> str:
+        # У токенов, выпущенных до появления jti, берём короткий digest
+        if "jti" in payload:
+            return payload["jti"]
+        return hashlib.blake2b(token.encode(), digest_size=12).hexdigest()
+
+    def _bucket(self, exp: int) -> int:
+        return exp // self.bucket_seconds
+
+    async def add(self, token_id: str, exp: int) -> None:
+        ttl = exp - int(time.time())
+        if ttl <= 0:
+            return
+
+        if not self.bucket_seconds:
+            await self.redis.set(self.KEY.format(token_id), 1, ex=ttl)
+            return
+
+        bucket = self._bucket(exp)
+        key = self.BUCKET_KEY.format(bucket)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, token_id)
+            pipe.expireat(key, (bucket + 1) * self.bucket_seconds)
+            await pipe.execute()
+
+    async def contains_many(self, tokens: list[tuple[str, int]]) -> list[bool]:
+        """Проверка пар (token_id, exp) за один запрос к Redis"""
+        if not tokens:
+            return []
+
+        if not self.bucket_seconds:
+            values = await self.redis.mget(
+                [self.KEY.format(token_id) for token_id, _ in tokens]
+            )
+            return [value is not None for value in values]
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for token_id, exp in tokens:
+                pipe.sismember(self.BUCKET_KEY.format(self._bucket(exp)), token_id)
+            return [bool(value) for value in await pipe.execute()]
+
+    async def contains_legacy(self, tokens: list[str]) -> list[bool]:
+        """
+        Отзывы, записанные до появления jti, хранились под ключом, равным
+        самому токену. Такие токены не несут jti и истекают не позже чем через
+        ACCESS_TOKEN_EXP_HOURS после обновления.
+        """
+        if not tokens:
+            return []
+
+        values = await self.redis.mget(tokens)
+        return [value is not None for value in values]
+
+    async def contains(self, token_id: str, exp: int) -> bool:
+        (revoked,) = await self.contains_many([(token_id, exp)])
+        return revoked
+
+    async def memory_report(self) -> dict[str, int]:
+        """Число записей и занимаемая ими память по данным MEMORY USAGE"""
+        report = {"keys": 0, "entries": 0, "bytes": 0}
+        for pattern, is_bucket in ((self.KEY, False), (self.BUCKET_KEY, True)):
+            async for key in self.redis.scan_iter(match=pattern.format("*")):
+                report["keys"] += 1
+                report["entries"] += await self.redis.scard(key) if is_bucket else 1
+                report["bytes"] += await self.redis.memory_usage(key) or 0
+        report["bytes_per_entry"] = report["bytes"] // max(report["entries"], 1)
+        return report
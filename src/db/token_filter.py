@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Фильтр Блума на bytearray с двойным хешированием blake2b"""
+
+    def __init__(self, size_bits: int, hash_count: int):
+        self.size_bits = max(size_bits, 8)
+        self.hash_count = max(hash_count, 1)
+        self.bits = bytearray(math.ceil(self.size_bits / 8))
+        self.items = 0
+
+    @classmethod
+    def for_capacity(
+        cls, capacity: int, error_rate: float, max_memory_bytes: int
+    ) -> "BloomFilter":
+        size_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        size_bits = min(size_bits, max_memory_bytes * 8)
+        hash_count = round(size_bits / capacity * math.log(2))
+        return cls(size_bits, hash_count)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+@dataclass
+class TokenFilterMetrics:
+    hits: int = 0
+    misses: int = 0
+    false_positives: int = 0
+    synced_entries: int = 0
+    rebuilds: int = 0
+
+
+class RevokedTokenFilter:
+    """
+    Локальная (на воркер) копия списка отозванных access-токенов в виде
+    фильтра Блума. Отзывы публикуются в Redis stream, каждый воркер читает
+    его в фоне. Отрицательный ответ фильтра означает, что токен точно не
+    отозван и в Redis можно не ходить.
+    """
+
+    STREAM_KEY = "revoked_access_tokens"
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int,
+        capacity: int,
+        error_rate: float,
+        max_memory_bytes: int,
+        rebuild_seconds: int,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_memory_bytes = max_memory_bytes
+        self.rebuild_seconds = rebuild_seconds
+        self.metrics = TokenFilterMetrics()
+        self.bloom = self._new_bloom()
+        self.ready = False
+
+    def _new_bloom(self) -> BloomFilter:
+        return BloomFilter.for_capacity(
+            self.capacity, self.error_rate, self.max_memory_bytes
+        )
+
+    def _min_id(self) -> str:
+        return str(int((time.time() - self.ttl) * 1000))
+
+    def might_contain(self, token: str) -> bool:
+        # Пока фильтр не синхронизирован, все проверки идут в Redis
+        if not self.ready:
+            return True
+
+        if token in self.bloom:
+            self.metrics.hits += 1
+            return True
+
+        self.metrics.misses += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        self.metrics.false_positives += 1
+
+    async def publish(self, token: str) -> None:
+        self.bloom.add(token)
+        await self.redis.xadd(
+            self.STREAM_KEY, {"token": token}, minid=self._min_id(), approximate=True
+        )
+
+    async def _rebuild(self) -> str:
+        bloom = self._new_bloom()
+        last_id = start = self._min_id()
+        while True:
+            entries = await self.redis.xrange(self.STREAM_KEY, min=start, count=1000)
+            for entry_id, fields in entries:
+                bloom.add(fields[b"token"].decode())
+                last_id = entry_id.decode()
+            if len(entries) < 1000:
+                break
+            start = f"({last_id}"
+
+        self.bloom = bloom
+        self.metrics.rebuilds += 1
+        return last_id
+
+    async def run(self) -> None:
+        """Фоновая синхронизация фильтра с потоком отзывов в Redis"""
+        while True:
+            try:
+                last_id = await self._rebuild()
+                rebuilt_at = time.monotonic()
+                self.ready = True
+
+                while time.monotonic() - rebuilt_at < self.rebuild_seconds:
+                    response = await self.redis.xread(
+                        {self.STREAM_KEY: last_id}, count=1000, block=1000
+                    )
+                    for _, entries in response:
+                        for entry_id, fields in entries:
+                            self.bloom.add(fields[b"token"].decode())
+                            last_id = entry_id.decode()
+                            self.metrics.synced_entries += 1
+            except RedisError:
+                logger.exception("Revoked token filter sync failed")
+                self.ready = False
+                await asyncio.sleep(1)
+
+    def stats(self) -> dict[str, int | bool]:
+        return {
+            **asdict(self.metrics),
+            "ready": self.ready,
+            "items": self.bloom.items,
+            "size_bits": self.bloom.size_bits,
+            "hash_count": self.bloom.hash_count,
+        }
+
+
+revoked_token_filter: RevokedTokenFilter | None = None
+
+
+async def get_revoked_token_filter() -> RevokedTokenFilter | None:
+    return revoked_token_filter
@@ -0,0 +1,74 @@
+import json
+
+from redis.asyncio import Redis
+
+from db.role_catalog import RoleCatalog
+
+
+class UserRolesCache:
+    """
+    Названия ролей пользователей в Redis. Запись хранит метку: поколение
+    пользователя и версию каталога ролей. Назначение и снятие роли
+    увеличивают поколение, переименование и удаление роли - версию каталога,
+    и запись с прежней меткой больше не используется. Метка читается до
+    обращения к БД, поэтому запись от читателя, начавшего до изменения,
+    сразу оказывается устаревшей. Версию каталога увеличивает только
+    RoleCatalog, без каталога кэш не используется.
+    """
+
+    KEY = "user_roles:{}"
+    GENERATION_KEY = "user_roles_generation:{}"
+
+    def __init__(self, redis: Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    async def stamps(self, user_ids: list[str]) -> dict[str, list[int]]:
+        """Текущие метки пользователей, читаются до запроса ролей из БД"""
+        version, *generations = await self.redis.mget(
+            RoleCatalog.VERSION_KEY,
+            *(self.GENERATION_KEY.format(user_id) for user_id in user_ids),
+        )
+        return {
+            str(user_id): [int(generation or 0), int(version or 0)]
+            for user_id, generation in zip(user_ids, generations)
+        }
+
+    async def get(self, user_id: str) -> tuple[list[str] | None, list[int]]:
+        """Роли из кэша или None и метка для последующего put"""
+        version, generation, data = await self.redis.mget(
+            RoleCatalog.VERSION_KEY,
+            self.GENERATION_KEY.format(user_id),
+            self.KEY.format(user_id),
+        )
+        stamp = [int(generation or 0), int(version or 0)]
+        if data is None:
+            return None, stamp
+
+        entry = json.loads(data)
+        return (entry["titles"] if entry["stamp"] == stamp else None), stamp
+
+    async def put_many(
+        self, user_roles: dict[str, list[str]], stamps: dict[str, list[int]]
+    ) -> None:
+        if not user_roles:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id, titles in user_roles.items():
+                entry = {"stamp": stamps[user_id], "titles": titles}
+                pipe.set(self.KEY.format(user_id), json.dumps(entry), ex=self.ttl)
+            await pipe.execute()
+
+    async def put(self, user_id: str, titles: list[str], stamp: list[int]) -> None:
+        await self.put_many({str(user_id): titles}, {str(user_id): stamp})
+
+    async def invalidate(self, user_id: str) -> None:
+        """Вызывается после коммита изменения ролей пользователя"""
+        generation_key = self.GENERATION_KEY.format(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incr(generation_key)
+            # Поколение переживает любую запись, заполненную до его увеличения
+            pipe.expire(generation_key, 2 * self.ttl)
+            pipe.delete(self.KEY.format(user_id))
+            await pipe.execute()
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -7,21 +8,73 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
                                     create_async_engine)
 
+from api import well_known
 from api.v1 import admins, auth, roles, users
 from core.config import settings
-from db import postgres, redis
+from db import (login_history_buffer, postgres, redis, role_catalog,
+                token_filter)
+from utils.jwt_keys import get_jwt_keyring
+from utils.password_hasher import password_hasher
+from utils.refresh_token_reaper import run_refresh_token_reaper
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Ошибки в ключах подписи должны останавливать запуск сервиса
+    get_jwt_keyring()
+    background_tasks: list[asyncio.Task] = []
     try:
         redis.redis = Redis(host=settings.redis_host, port=settings.redis_port)
         postgres.engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
         postgres.async_session = async_sessionmaker(
             bind=postgres.engine, expire_on_commit=False, class_=AsyncSession
         )
+        login_history_buffer.login_history_buffer = (
+            login_history_buffer.LoginHistoryBuffer(
+                postgres.async_session,
+                batch_size=settings.login_history_batch_size,
+                flush_interval=settings.login_history_flush_ms / 1000,
+                max_size=settings.login_history_buffer_size,
+            )
+        )
+        login_history_buffer.login_history_buffer.start()
+        if settings.role_catalog_enabled:
+            role_catalog.role_catalog = role_catalog.RoleCatalog(
+                postgres.async_session,
+                redis.redis,
+                poll_seconds=settings.role_catalog_poll_seconds,
+            )
+            await role_catalog.role_catalog.load()
+            background_tasks.append(
+                asyncio.create_task(role_catalog.role_catalog.run())
+            )
+        # Refresh-токены в Redis удаляются по TTL
+        if (
+            settings.refresh_token_reaper_enabled
+            and settings.refresh_token_store == "postgres"
+        ):
+            background_tasks.append(
+                asyncio.create_task(run_refresh_token_reaper(postgres.async_session))
+            )
+        if settings.token_filter_enabled:
+            token_filter.revoked_token_filter = token_filter.RevokedTokenFilter(
+                redis.redis,
+                ttl=settings.access_token_exp_hours * 3600,
+                capacity=settings.token_filter_capacity,
+                error_rate=settings.token_filter_error_rate,
+                max_memory_bytes=settings.token_filter_max_memory_kb * 1024,
+                rebuild_seconds=settings.token_filter_rebuild_seconds,
+            )
+            background_tasks.append(
+                asyncio.create_task(token_filter.revoked_token_filter.run())
+            )
         yield
     finally:
+        for task in background_tasks:
+            task.cancel()
+        if login_history_buffer.login_history_buffer:
+            await login_history_buffer.login_history_buffer.close()
+        password_hasher.shutdown()
         await redis.redis.aclose()
 
 
@@ -37,5 +90,6 @@ app.include_router(roles.router, prefix="/api/v1/roles", tags=["roles"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(admins.router, prefix="/api/v1/users", tags=["admins"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(well_known.router, prefix="/.well-known", tags=["jwks"])
 
 add_pagination(app)
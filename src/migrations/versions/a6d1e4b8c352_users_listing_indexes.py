@@ -0,0 +1,88 @@
+"""users listing indexes
+
+Revision ID: a6d1e4b8c352
+Revises: f3c7a9d05b21
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1e4b8c352'
+down_revision: Union[str, None] = 'f3c7a9d05b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # created_at входит в ключ страниц и не может быть NULL
+    op.execute("UPDATE users SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column(
+        'users',
+        'created_at',
+        existing_type=sa.DateTime(),
+        server_default=sa.text('now()'),
+    )
+    # SET NOT NULL без полного сканирования под блокировкой: проверка
+    # проходит через валидированный CHECK, который держит только
+    # SHARE UPDATE EXCLUSIVE и не мешает записи
+    op.create_check_constraint(
+        'users_created_at_not_null',
+        'users',
+        'created_at IS NOT NULL',
+        postgresql_not_valid=True,
+    )
+    # Индексы на users строятся без блокировки записи, CONCURRENTLY
+    # нельзя выполнить внутри транзакции
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE users VALIDATE CONSTRAINT users_created_at_not_null')
+        op.alter_column(
+            'users', 'created_at', existing_type=sa.DateTime(), nullable=False
+        )
+        op.drop_constraint('users_created_at_not_null', 'users', type_='check')
+        op.create_index(
+            'ix_users_created_at_id',
+            'users',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_login_pattern',
+            'users',
+            ['login'],
+            unique=False,
+            postgresql_ops={'login': 'varchar_pattern_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_email',
+            'users',
+            ['email'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in (
+            'ix_users_email',
+            'ix_users_login_pattern',
+            'ix_users_created_at_id',
+        ):
+            op.drop_index(
+                index_name, table_name='users', postgresql_concurrently=True
+            )
+    op.alter_column(
+        'users',
+        'created_at',
+        existing_type=sa.DateTime(),
+        server_default=None,
+        nullable=True,
+    )
@@ -0,0 +1,55 @@
+"""hash refresh tokens
+
+Revision ID: b7d2e41c9a63
+Revises: 55f240fba5b9
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e41c9a63'
+down_revision: Union[str, None] = '55f240fba5b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('refresh_tokens', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    # Существующие токены переводим в sha256, чтобы выданные сессии остались рабочими
+    op.execute(
+        "UPDATE refresh_tokens "
+        "SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+    )
+    # Прежние JWT содержали только user_id и exp с точностью до секунды, поэтому
+    # два входа за одну секунду давали одинаковые токены. Из дублей остаётся
+    # одна строка, иначе уникальное ограничение не создать
+    op.execute(
+        "DELETE FROM refresh_tokens AS duplicate USING refresh_tokens AS kept "
+        "WHERE duplicate.token_hash = kept.token_hash "
+        "AND duplicate.ctid > kept.ctid"
+    )
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.create_unique_constraint(
+        'refresh_tokens_token_hash_key', 'refresh_tokens', ['token_hash']
+    )
+    op.create_index(
+        op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False
+    )
+    op.drop_column('refresh_tokens', 'token')
+
+
+def downgrade() -> None:
+    # Исходные токены из хешей не восстановить, поэтому сессии сбрасываются
+    op.execute("DELETE FROM refresh_tokens")
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(length=255), nullable=False))
+    op.drop_index(op.f('ix_refresh_tokens_user_id'), table_name='refresh_tokens')
+    op.drop_constraint(
+        'refresh_tokens_token_hash_key', 'refresh_tokens', type_='unique'
+    )
+    op.drop_column('refresh_tokens', 'token_hash')
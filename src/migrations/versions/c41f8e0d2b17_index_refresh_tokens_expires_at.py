@@ -0,0 +1,29 @@
+"""index refresh tokens expires_at
+
+Revision ID: c41f8e0d2b17
+Revises: b7d2e41c9a63
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f8e0d2b17'
+down_revision: Union[str, None] = 'b7d2e41c9a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
@@ -0,0 +1,112 @@
+"""users role_titles
+
+Revision ID: d5a19c3e7f42
+Revises: c41f8e0d2b17
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a19c3e7f42'
+down_revision: Union[str, None] = 'c41f8e0d2b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия models.associations.ROLE_TITLES_DDL на момент миграции
+ROLE_TITLES_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION user_role_titles(p_user_id uuid)
+    RETURNS varchar[] AS $$
+        SELECT coalesce(array_agg(roles.title ORDER BY roles.title), '{}')
+        FROM user_role JOIN roles ON roles.id = user_role.role_id
+        WHERE user_role.user_id = p_user_id
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION user_role_sync_role_titles() RETURNS trigger AS $$
+    DECLARE
+        user_ids uuid[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            user_ids := ARRAY[NEW.user_id];
+        ELSIF TG_OP = 'DELETE' THEN
+            user_ids := ARRAY[OLD.user_id];
+        ELSE
+            user_ids := ARRAY[OLD.user_id, NEW.user_id];
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM 1 FROM roles WHERE id = NEW.role_id FOR SHARE;
+        END IF;
+        PERFORM 1 FROM users WHERE id = ANY(user_ids)
+        ORDER BY id FOR NO KEY UPDATE;
+        UPDATE users SET role_titles = user_role_titles(users.id)
+        WHERE users.id = ANY(user_ids);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER user_role_sync_role_titles
+    AFTER INSERT OR UPDATE OR DELETE ON user_role
+    FOR EACH ROW EXECUTE FUNCTION user_role_sync_role_titles()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION roles_sync_role_titles() RETURNS trigger AS $$
+    BEGIN
+        PERFORM 1 FROM users
+        WHERE users.id IN (
+            SELECT user_role.user_id FROM user_role WHERE user_role.role_id = NEW.id
+        )
+        ORDER BY users.id FOR NO KEY UPDATE;
+        UPDATE users SET role_titles = user_role_titles(users.id)
+        WHERE users.id IN (
+            SELECT user_role.user_id FROM user_role WHERE user_role.role_id = NEW.id
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER roles_sync_role_titles
+    AFTER UPDATE OF title ON roles
+    FOR EACH ROW WHEN (OLD.title IS DISTINCT FROM NEW.title)
+    EXECUTE FUNCTION roles_sync_role_titles()
+    """,
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column(
+            'role_titles',
+            postgresql.ARRAY(sa.String(length=50)),
+            server_default='{}',
+            nullable=False,
+        ),
+    )
+    for statement in ROLE_TITLES_DDL:
+        op.execute(statement)
+    # Первичное заполнение, дальше значения поддерживают триггеры
+    op.execute(
+        """
+        UPDATE users SET role_titles = user_role_titles(users.id)
+        WHERE users.id IN (SELECT DISTINCT user_role.user_id FROM user_role)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER roles_sync_role_titles ON roles')
+    op.execute('DROP TRIGGER user_role_sync_role_titles ON user_role')
+    op.execute('DROP FUNCTION roles_sync_role_titles()')
+    op.execute('DROP FUNCTION user_role_sync_role_titles()')
+    op.execute('DROP FUNCTION user_role_titles(uuid)')
+    op.drop_column('users', 'role_titles')
@@ -0,0 +1,33 @@
+"""roles code
+
+Revision ID: e8b24f6a1c90
+Revises: d5a19c3e7f42
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b24f6a1c90'
+down_revision: Union[str, None] = 'd5a19c3e7f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Существующие роли получают коды при добавлении identity-столбца
+    op.add_column(
+        'roles',
+        sa.Column('code', sa.SmallInteger(), sa.Identity(), nullable=False),
+    )
+    op.create_unique_constraint(None, 'roles', ['code'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('roles_code_key', 'roles', type_='unique')
+    op.drop_column('roles', 'code')
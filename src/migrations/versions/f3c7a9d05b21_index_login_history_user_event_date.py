@@ -0,0 +1,41 @@
+"""index login_history user_id event_date
+
+Revision ID: f3c7a9d05b21
+Revises: e8b24f6a1c90
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c7a9d05b21'
+down_revision: Union[str, None] = 'e8b24f6a1c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Индекс строится без блокировки записи в login_history,
+    # CONCURRENTLY нельзя выполнить внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_login_history_user_id_event_date',
+            'login_history',
+            ['user_id', sa.text('event_date DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_login_history_user_id_event_date',
+            table_name='login_history',
+            postgresql_concurrently=True,
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Table, func
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Table, event, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.postgres import Base
@@ -10,3 +10,77 @@ user_role = Table(
     Column("role_id", UUID(), ForeignKey("roles.id"), primary_key=True),
     Column("created_at", DateTime, server_default=func.now()),
 )
+
+# Денормализованный users.role_titles поддерживается триггерами при
+# назначении и снятии ролей и при переименовании роли. Команды выполняются
+# при metadata.create_all, миграция d5a19c3e7f42 хранит свою копию.
+#
+# Триггеры сначала блокируют строки users и только следующей командой
+# пересчитывают массив: в READ COMMITTED новая команда видит роли,
+# назначенные параллельной транзакцией, которая держала блокировку.
+# FOR NO KEY UPDATE не конфликтует с FOR KEY SHARE от проверки внешнего
+# ключа user_role, поэтому два назначения не блокируют друг друга навсегда.
+# Назначение роли берёт FOR SHARE на строку роли и ждёт её переименования.
+ROLE_TITLES_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION user_role_titles(p_user_id uuid)
+    RETURNS varchar[] AS $$
+        SELECT coalesce(array_agg(roles.title ORDER BY roles.title), '{}')
+        FROM user_role JOIN roles ON roles.id = user_role.role_id
+        WHERE user_role.user_id = p_user_id
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION user_role_sync_role_titles() RETURNS trigger AS $$
+    DECLARE
+        user_ids uuid[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            user_ids := ARRAY[NEW.user_id];
+        ELSIF TG_OP = 'DELETE' THEN
+            user_ids := ARRAY[OLD.user_id];
+        ELSE
+            user_ids := ARRAY[OLD.user_id, NEW.user_id];
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM 1 FROM roles WHERE id = NEW.role_id FOR SHARE;
+        END IF;
+        PERFORM 1 FROM users WHERE id = ANY(user_ids)
+        ORDER BY id FOR NO KEY UPDATE;
+        UPDATE users SET role_titles = user_role_titles(users.id)
+        WHERE users.id = ANY(user_ids);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER user_role_sync_role_titles
+    AFTER INSERT OR UPDATE OR DELETE ON user_role
+    FOR EACH ROW EXECUTE FUNCTION user_role_sync_role_titles()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION roles_sync_role_titles() RETURNS trigger AS $$
+    BEGIN
+        PERFORM 1 FROM users
+        WHERE users.id IN (
+            SELECT user_role.user_id FROM user_role WHERE user_role.role_id = NEW.id
+        )
+        ORDER BY users.id FOR NO KEY UPDATE;
+        UPDATE users SET role_titles = user_role_titles(users.id)
+        WHERE users.id IN (
+            SELECT user_role.user_id FROM user_role WHERE user_role.role_id = NEW.id
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER roles_sync_role_titles
+    AFTER UPDATE OF title ON roles
+    FOR EACH ROW WHEN (OLD.title IS DISTINCT FROM NEW.title)
+    EXECUTE FUNCTION roles_sync_role_titles()
+    """,
+)
+
+for statement in ROLE_TITLES_DDL:
+    event.listen(user_role, "after_create", DDL(statement))
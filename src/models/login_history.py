@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -24,3 +24,12 @@ class LoginHistory(Base):
 
     def __repr__(self) -> str:
         return f"<LoginHistory {self.user_id} at {self.event_date}>"
+
+
+# Страницы истории пользователя читаются по ключу (event_date, id)
+Index(
+    "ix_login_history_user_id_event_date",
+    LoginHistory.user_id,
+    LoginHistory.event_date.desc(),
+    LoginHistory.id.desc(),
+)
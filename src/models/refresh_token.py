@@ -1,3 +1,4 @@
+import hashlib
 import uuid
 
 from sqlalchemy import Column, DateTime, ForeignKey, String, func
@@ -17,11 +18,18 @@ class RefreshToken(Base):
         unique=True,
         nullable=False,
     )
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    token = Column(String(255), nullable=False)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
+    )
+    # Храним только sha256 от токена: фиксированная длина и уникальный индекс
+    token_hash = Column(String(64), unique=True, nullable=False)
     created_at = Column(DateTime, default=func.now())
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     user = relationship("User", back_populates="refresh_tokens")
 
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
     def __repr__(self) -> str:
-        return f"<RefreshToken {self.token} for User {self.user_id}>"
+        return f"<RefreshToken {self.token_hash} for User {self.user_id}>"
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Identity, SmallInteger, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.postgres import Base
@@ -16,6 +16,8 @@ class Role(Base):
         unique=True,
         nullable=False,
     )
+    # Короткий код роли для компактных access-токенов
+    code = Column(SmallInteger, Identity(), unique=True, nullable=False)
     title = Column(String(50), unique=True, nullable=False)
 
     def __repr__(self) -> str:
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import Column, Date, DateTime, String, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Date, DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 from werkzeug.security import check_password_hash, generate_password_hash
 
@@ -26,16 +26,26 @@ class User(Base):
     last_name = Column(String(50))
     email = Column(EmailType)
     birthdate = Column(Date)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), nullable=False
+    )
+    # Заполняется триггерами на user_role и roles, см. models/associations.py
+    role_titles = Column(ARRAY(String(50)), nullable=False, server_default="{}")
     roles = relationship("Role", secondary=user_role, backref="users", cascade="all, delete")
     login_history = relationship("LoginHistory", back_populates="user", cascade="all, delete")
     refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete")
 
     def __init__(
-        self, login: str, password: str, first_name: str, last_name: str
+        self,
+        login: str,
+        password: str,
+        first_name: str,
+        last_name: str,
+        hashed: bool = False,
     ) -> None:
         self.login = login
-        self.password = generate_password_hash(password)
+        # Пароль может быть уже захеширован вне event loop (см. PasswordHasher)
+        self.password = password if hashed else generate_password_hash(password)
         self.first_name = first_name
         self.last_name = last_name
 
@@ -44,3 +54,14 @@ class User(Base):
 
     def __repr__(self) -> str:
         return f"<User {self.login}>"
+
+
+# Индексы для списка пользователей: страницы по ключу (created_at, id),
+# фильтры по префиксу логина и по email (email хранится в нижнем регистре)
+Index("ix_users_created_at_id", User.created_at.desc(), User.id.desc())
+Index(
+    "ix_users_login_pattern",
+    User.login,
+    postgresql_ops={"login": "varchar_pattern_ops"},
+)
+Index("ix_users_email", User.email)
@@ -1,5 +1,9 @@
+from typing import Any, Literal
+
 from pydantic import BaseModel, Field
 
+from core.config import settings
+
 
 class AuthOutputSchema(BaseModel):
     access_token: str
@@ -14,3 +18,17 @@ class RefreshInputSchema(BaseModel):
 class LoginInputSchema(BaseModel):
     login: str = Field(min_length=1)
     password: str = Field(min_length=1)
+
+
+class IntrospectInputSchema(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=settings.introspect_max_tokens)
+
+
+class TokenIntrospectionSchema(BaseModel):
+    active: bool
+    status: Literal["active", "invalid", "revoked"]
+    claims: dict[str, Any] | None = None
+
+
+class IntrospectOutputSchema(BaseModel):
+    results: list[TokenIntrospectionSchema]
@@ -0,0 +1,21 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: list[T]
+    # Передаётся в cursor для следующей страницы, None на последней
+    next_cursor: str | None = None
+
+
+class OffsetPage(BaseModel, Generic[T]):
+    items: list[T]
+    # None, если подсчёт отключён; при оценке значение приблизительное
+    total: int | None = None
+    page: int
+    size: int
+    pages: int | None = None
+    has_next: bool
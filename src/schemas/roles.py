@@ -2,12 +2,16 @@ from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
 
+from core.config import settings
 from schemas.mixins import IdMixin
 
 
 class RoleSchema(IdMixin):
     title: str
 
+    class Config:
+        from_attributes = True
+
 
 class RoleCreateSchema(BaseModel):
     title: str
@@ -15,3 +19,12 @@ class RoleCreateSchema(BaseModel):
 
 class RoleUpdateSchema(BaseModel):
     role_id: UUID = Field(default_factory=uuid4, serialization_alias="id")
+
+
+class UsersRolesInputSchema(BaseModel):
+    user_ids: list[UUID] = Field(min_length=1, max_length=settings.users_batch_max_ids)
+
+
+class UsersRolesSchema(BaseModel):
+    roles: dict[UUID, list[RoleSchema]]
+    not_found: list[UUID]
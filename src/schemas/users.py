@@ -1,8 +1,14 @@
 from datetime import date, datetime
+from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field, model_validator
+from pydantic import (BaseModel, EmailStr, Field, field_validator,
+                      model_validator)
+
+from core.config import settings
+from utils.datetimes import to_naive_utc
 
 from .mixins import IdMixin
+from .roles import RoleSchema
 
 
 class UserSchema(IdMixin):
@@ -16,6 +22,34 @@ class UserSchema(IdMixin):
         from_attributes = True
 
 
+class UsersInputSchema(BaseModel):
+    user_ids: list[UUID] = Field(min_length=1, max_length=settings.users_batch_max_ids)
+
+
+class UsersSchema(BaseModel):
+    users: list[UserSchema]
+    not_found: list[UUID]
+
+
+class UserListItemSchema(UserSchema):
+    created_at: datetime
+    roles: list[RoleSchema]
+
+
+class UserListFilterSchema(BaseModel):
+    login_prefix: str | None = Field(None, min_length=1)
+    email: str | None = None
+    role: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def normalize_time_zone(cls, value: datetime | None) -> datetime | None:
+        # created_at хранится в UTC без часового пояса
+        return to_naive_utc(value) if value else value
+
+
 class UpdateUserSchema(BaseModel):
     login: str | None = None
     password: str | None = None
@@ -35,6 +69,9 @@ class UserLoginHistorySchema(BaseModel):
     event_date: datetime
     success: bool
 
+    class Config:
+        from_attributes = True
+
 
 class CreateUserSchema(BaseModel):
     login: str = Field(min_length=1)
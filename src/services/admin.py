@@ -1,83 +1,230 @@
+import re
+from datetime import datetime
 from functools import lru_cache
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import select
+from redis.asyncio import Redis
+from sqlalchemy import (String, any_, cast, delete, exists, func, literal,
+                        select, true, tuple_)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
+from core.config import settings
 from db.postgres import get_postgres_session
+from db.redis import get_redis
+from db.role_catalog import RoleCatalog, get_role_catalog
+from db.user_roles_cache import UserRolesCache
+from models.associations import user_role
 from models.roles import Role
 from models.user import User
+from schemas.users import UserListFilterSchema
 from services.exceptions import (ConflictError, ObjectNotFoundError,
                                  UserNotFoundError)
+from utils.dataloader import DataLoader
 
 
 class AdminService:
-    def __init__(self, postgres_session: AsyncSession):
+    def __init__(
+        self,
+        postgres_session: AsyncSession,
+        roles_cache: UserRolesCache | None = None,
+    ):
         self.postgres_session = postgres_session
+        self.roles_cache = roles_cache
+
+    async def get_user_roles(
+        self, user_id: UUID, limit: int, offset: int = 0, with_total: bool = True
+    ) -> tuple[list[Role], int | None]:
+        """
+        Страница ролей пользователя и их общее число одним запросом. Строка
+        пользователя присоединяет страницу ролей через LATERAL, поэтому
+        отсутствие строк означает, что нет самого пользователя. Общее число
+        считается один раз в материализованном CTE, а не для каждой строки.
+        """
+        page = (
+            select(Role)
+            .join(user_role, user_role.c.role_id == Role.id)
+            .where(user_role.c.user_id == User.id)
+            .order_by(Role.title, Role.id)
+            .limit(limit)
+            .offset(offset)
+            .lateral("page")
+        )
+        role = aliased(Role, page)
+        query = select(User.id, role).select_from(User)
+        if with_total:
+            total = (
+                select(func.count().label("total"))
+                .select_from(user_role)
+                .where(user_role.c.user_id == user_id)
+                .cte("total")
+                .prefix_with("MATERIALIZED")
+            )
+            query = query.add_columns(total.c.total).join(total, true())
+        query = query.outerjoin(page, true()).where(User.id == user_id)
 
-    async def get_user_roles(self, user_id: UUID):
         async with self.postgres_session() as session:
-            user_scalars = await session.scalars(select(User).where(User.id == user_id))
-            user = user_scalars.first()
-            if not user:
-                raise UserNotFoundError
+            rows = (await session.execute(query)).all()
 
-            role_scalars = await session.scalars(
-                select(Role).join(User.roles).where(User.id == user_id)
-            )
-            roles = role_scalars.fetchall()
-            if not roles:
-                raise ObjectNotFoundError
-            return roles
+        if not rows:
+            raise UserNotFoundError
+
+        roles = [row[1] for row in rows if row[1] is not None]
+        if not roles and not offset:
+            raise ObjectNotFoundError
+        return roles, rows[0][2] if with_total else None
+
+    async def get_users_roles(self, user_ids: list[UUID]) -> dict[UUID, list[Role]]:
+        """
+        Роли нескольких пользователей одним запросом. Пользователи без ролей
+        получают пустой список, несуществующих в результате нет.
+        """
+        query = (
+            select(User.id, Role)
+            .outerjoin(user_role, user_role.c.user_id == User.id)
+            .outerjoin(Role, Role.id == user_role.c.role_id)
+            .where(User.id == any_(literal(user_ids, ARRAY(User.id.type))))
+            .order_by(User.id, Role.title)
+        )
 
-    async def add_user_role(self, user_id: UUID, role_id: UUID):
         async with self.postgres_session() as session:
-            role_scalars = await session.scalars(select(Role).where(Role.id == role_id))
-            role = role_scalars.first()
-            if not role:
-                raise ObjectNotFoundError
+            rows = (await session.execute(query)).all()
+
+        users_roles: dict[UUID, list[Role]] = {}
+        for found_id, role in rows:
+            roles = users_roles.setdefault(found_id, [])
+            if role is not None:
+                roles.append(role)
+        return users_roles
 
-            user_scalars = await session.scalars(
-                select(User).options(selectinload(User.roles)).where(User.id == user_id)
+    async def list_users(
+        self,
+        filters: UserListFilterSchema,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[User]:
+        """
+        Страница пользователей от новых к старым по ключу (created_at, id).
+        Роли не загружаются, для них есть roles_loader.
+        """
+        query = (
+            select(User)
+            .order_by(User.created_at.desc(), User.id.desc())
+            .limit(limit)
+        )
+        if after:
+            query = query.where(tuple_(User.created_at, User.id) < tuple_(*after))
+        if filters.login_prefix:
+            # Шаблон собирается заранее, чтобы индекс по префиксу мог использоваться
+            prefix = re.sub(r"([\\%_])", r"\\\1", filters.login_prefix)
+            query = query.where(User.login.like(f"{prefix}%", escape="\\"))
+        if filters.email:
+            # Email хранится в нижнем регистре, сравнение идёт без lower()
+            query = query.where(cast(User.email, String) == filters.email.lower())
+        if filters.role:
+            query = query.where(
+                exists()
+                .where(user_role.c.user_id == User.id)
+                .where(user_role.c.role_id == Role.id)
+                .where(Role.title == filters.role)
             )
-            user = user_scalars.first()
-            if not user:
-                raise UserNotFoundError
+        if filters.created_from:
+            query = query.where(User.created_at >= filters.created_from)
+        if filters.created_to:
+            query = query.where(User.created_at < filters.created_to)
+
+        async with self.postgres_session() as session:
+            return list(await session.scalars(query))
+
+    def roles_loader(self) -> DataLoader:
+        """Загрузчик ролей, собирающий запросы в один get_users_roles"""
+        return DataLoader(self.get_users_roles, default=())
 
-            user.roles.append(role)
-            session.add(user)
+    async def add_user_role(self, user_id: UUID, role_id: UUID):
+        """
+        Назначение роли одним запросом: вставка в user_role и чтение роли.
+        Несуществующие пользователь и роль определяются по ошибке внешнего
+        ключа, уже назначенная роль - по пустому RETURNING.
+        """
+        inserted = (
+            insert(user_role)
+            .values(user_id=user_id, role_id=role_id)
+            .on_conflict_do_nothing()
+            .returning(user_role.c.role_id)
+            .cte("inserted")
+        )
+        query = select(
+            Role, select(func.count()).select_from(inserted).scalar_subquery()
+        ).where(Role.id == role_id)
+
+        async with self.postgres_session() as session:
             try:
+                row = (await session.execute(query)).first()
                 await session.commit()
-            except IntegrityError:
-                raise ConflictError
-            return role
+            except IntegrityError as e:
+                raise self._not_found_error(e)
+
+        if not row[1]:
+            raise ConflictError
+
+        if self.roles_cache:
+            await self.roles_cache.invalidate(user_id)
+        return row[0]
 
     async def remove_user_role(self, user_id: UUID, role_id: UUID):
-        async with self.postgres_session() as session:
-            user_scalars = await session.scalars(
-                select(User).options(selectinload(User.roles)).where(User.id == user_id)
+        """
+        Снятие роли одним запросом. Вместе с удалением строки user_role
+        читаются роль и признак существования пользователя.
+        """
+        deleted = (
+            delete(user_role)
+            .where(user_role.c.user_id == user_id, user_role.c.role_id == role_id)
+            .returning(user_role.c.role_id)
+            .cte("deleted")
+        )
+        one_row = select(literal(1)).subquery()
+        query = (
+            select(
+                Role,
+                exists().where(User.id == user_id),
+                select(func.count()).select_from(deleted).scalar_subquery(),
             )
-            user = user_scalars.first()
-            if not user:
-                raise UserNotFoundError
+            .select_from(one_row)
+            .outerjoin(Role, Role.id == role_id)
+        )
 
-            role_scalars = await session.scalars(select(Role).where(Role.id == role_id))
-            role = role_scalars.first()
-            if not role:
-                raise ObjectNotFoundError
+        async with self.postgres_session() as session:
+            role, user_exists, removed = (await session.execute(query)).one()
+            await session.commit()
 
-            if role in user.roles:
-                user.roles.remove(role)
+        if not user_exists:
+            raise UserNotFoundError
+        if role is None:
+            raise ObjectNotFoundError
 
-            await session.commit()
-            return role
+        if removed and self.roles_cache:
+            await self.roles_cache.invalidate(user_id)
+        return role
+
+    @staticmethod
+    def _not_found_error(error: IntegrityError) -> Exception:
+        # Имя нарушенного внешнего ключа указывает на отсутствующую сторону
+        if "user_role_user_id_fkey" in str(error.orig):
+            return UserNotFoundError()
+        return ObjectNotFoundError()
 
 
 @lru_cache()
 def get_admin_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    catalog: RoleCatalog | None = Depends(get_role_catalog),
+    redis: Redis = Depends(get_redis),
 ) -> AdminService:
-    return AdminService(postgres_session)
+    roles_cache = None
+    # Без каталога изменения ролей не меняют версию, и кэш не используется
+    if settings.user_roles_cache_enabled and catalog:
+        roles_cache = UserRolesCache(redis, settings.user_roles_cache_ttl)
+    return AdminService(postgres_session, roles_cache)
@@ -1,3 +1,4 @@
+import secrets
 from datetime import datetime, timedelta
 from functools import lru_cache
 
@@ -5,38 +6,74 @@ import jwt
 from fastapi import Depends
 from redis import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import delete, exists, select
+from sqlalchemy.sql import select
 
 import models as db_models
-from core.config import JWT_ALGORITHM, settings
+from core.config import settings
+from db.login_history_buffer import (LoginHistoryBuffer,
+                                     get_login_history_buffer)
 from db.postgres import get_postgres_session
 from db.redis import RedisCache, get_redis
+from db.refresh_token_store import (AbstractRefreshTokenStore,
+                                    create_refresh_token_store)
+from db.token_denylist import TokenDenylist
+from db.token_filter import RevokedTokenFilter, get_revoked_token_filter
+from services.exceptions import InvalidCredentialsError, ObjectNotFoundError
+from utils.jwt_keys import get_jwt_keyring
+from utils.password_hasher import (HashPriority, PasswordHasher,
+                                   get_password_hasher)
+from utils.token_claims import (ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE,
+                                is_access_claims, pack_access_claims)
+from utils.token_epochs import token_epochs
 
 
 class AuthService:
-    def __init__(self, postgres_session: AsyncSession, redis: Redis):
+    def __init__(
+        self,
+        postgres_session: AsyncSession,
+        redis: Redis,
+        password_hasher: PasswordHasher,
+        refresh_tokens: AbstractRefreshTokenStore,
+        token_filter: RevokedTokenFilter | None = None,
+        login_history: LoginHistoryBuffer | None = None,
+    ):
         self.postgres_session = postgres_session
         self.redis = RedisCache(redis)
+        self.denylist = TokenDenylist(redis, settings.revoked_token_bucket_seconds)
+        self.password_hasher = password_hasher
+        self.refresh_tokens = refresh_tokens
+        self.token_filter = token_filter
+        self.login_history = login_history
 
-    @staticmethod
-    async def generate_access_token(user_id: str, user_roles: list[str]) -> str:
+    async def generate_access_token(self, user_id: str, user_roles: list[str]) -> str:
         valid_till = datetime.now() + timedelta(hours=settings.access_token_exp_hours)
         payload = {
             "user_id": user_id,
             "exp": int(valid_till.timestamp()),
             "roles": user_roles,
+            "epoch": await token_epochs.get(self.redis.cache_client, user_id),
+            "jti": secrets.token_urlsafe(8),
+            "typ": ACCESS_TOKEN_TYPE,
         }
+        if settings.access_token_format == "compact":
+            payload = pack_access_claims(payload)
 
-        return jwt.encode(payload, settings.jwt_secret_key, algorithm=JWT_ALGORITHM)
+        return get_jwt_keyring().encode(payload)
 
     @staticmethod
     def _generate_refresh_token(user_id: str, valid_till: datetime) -> str:
+        if settings.refresh_token_format == "opaque":
+            return secrets.token_urlsafe(32)
+
         payload = {
             "user_id": user_id,
             "exp": int(valid_till.timestamp()),
+            # Уникальность токена нужна для unique-индекса по его хешу
+            "jti": secrets.token_hex(8),
+            "typ": REFRESH_TOKEN_TYPE,
         }
 
-        return jwt.encode(payload, settings.jwt_secret_key, algorithm=JWT_ALGORITHM)
+        return get_jwt_keyring().encode(payload)
 
     async def save_refresh_token(
         self, user_id: str, refresh_token: str, valid_till: datetime
@@ -44,7 +81,7 @@ class AuthService:
         async with self.postgres_session() as session:
             refresh_token = db_models.RefreshToken(
                 user_id=user_id,
-                token=refresh_token,
+                token_hash=db_models.RefreshToken.hash_token(refresh_token),
                 expires_at=valid_till,
             )
             session.add(refresh_token)
@@ -60,16 +97,82 @@ class AuthService:
 
         return refresh_token
 
-    async def is_refresh_token_valid(self, refresh_token: str) -> bool:
+    async def login(self, login: str, password: str) -> tuple[str, str]:
+        """
+        Вход пользователя: пароль и названия ролей читаются из одной строки
+        users по индексу login, refresh-токен сохраняется одним коммитом. История входов
+        пишется через буфер, а без него - в той же транзакции.
+        Возвращает пару access, refresh.
+        """
         async with self.postgres_session() as session:
-            return await session.execute(
+            results = await session.execute(
                 select(
-                    exists(db_models.RefreshToken).where(
-                        db_models.RefreshToken.token == refresh_token,
-                        db_models.RefreshToken.expires_at >= datetime.now(),
-                    )
-                )
+                    db_models.User.id,
+                    db_models.User.password,
+                    db_models.User.role_titles,
+                ).where(db_models.User.login == login)
             )
+            user = results.first()
+        if not user:
+            raise ObjectNotFoundError
+
+        # Соединение с БД не удерживается, пока пароль проверяется в пуле
+        if not await self.password_hasher.check_password(
+            user.password, password, HashPriority.LOGIN
+        ):
+            if self.login_history:
+                self.login_history.record(user.id, success=False)
+            else:
+                async with self.postgres_session() as session:
+                    session.add(db_models.LoginHistory(user_id=user.id, success=False))
+                    await session.commit()
+            raise InvalidCredentialsError
+
+        user_id = str(user.id)
+        valid_till = datetime.now() + timedelta(days=settings.refresh_token_exp_days)
+        refresh_token = self._generate_refresh_token(user_id, valid_till)
+
+        async with self.postgres_session() as session:
+            if self.login_history:
+                self.login_history.record(user.id, success=True)
+            else:
+                session.add(db_models.LoginHistory(user_id=user.id, success=True))
+            await self.refresh_tokens.save(
+                user_id,
+                db_models.RefreshToken.hash_token(refresh_token),
+                valid_till,
+                session,
+            )
+            await session.commit()
+
+        access_token = await self.generate_access_token(user_id, user.role_titles)
+
+        return access_token, refresh_token
+
+    @staticmethod
+    def is_refresh_token_signed(refresh_token: str) -> bool:
+        """
+        Подпись и срок refresh-токена в формате JWT проверяются до обращения
+        к хранилищу. Непрозрачный токен проверяется только поиском по хешу.
+        """
+        if refresh_token.count(".") != 2:
+            return True
+        try:
+            payload = get_jwt_keyring().decode(refresh_token)
+        except jwt.exceptions.InvalidTokenError:
+            return False
+        return not is_access_claims(payload)
+
+    async def get_refresh_token_user(self, refresh_token: str) -> str | None:
+        """Возвращает id владельца действующего refresh-токена"""
+        if not self.is_refresh_token_signed(refresh_token):
+            return None
+        return await self.refresh_tokens.get_user(
+            db_models.RefreshToken.hash_token(refresh_token)
+        )
+
+    async def is_refresh_token_valid(self, refresh_token: str) -> bool:
+        return await self.get_refresh_token_user(refresh_token) is not None
 
     async def update_refresh_token(
         self,
@@ -77,44 +180,118 @@ class AuthService:
         refresh_token: str,
         user_roles: list[str],
     ) -> tuple[str, str]:
-        await self.invalidate_refresh_token(refresh_token)
-        refresh_token_new = await self.emit_refresh_token(user_id)
+        """Ротация refresh-токена: старый токен атомарно заменяется новым"""
+        valid_till = datetime.now() + timedelta(days=settings.refresh_token_exp_days)
+        refresh_token_new = self._generate_refresh_token(user_id, valid_till)
+
+        rotated = await self.refresh_tokens.rotate(
+            user_id,
+            db_models.RefreshToken.hash_token(refresh_token),
+            db_models.RefreshToken.hash_token(refresh_token_new),
+            valid_till,
+        )
+        if not rotated:
+            # Токен уже использован параллельным запросом
+            raise ObjectNotFoundError
+
         access_token = await self.generate_access_token(user_id, user_roles)
 
         return refresh_token_new, access_token
 
-    async def invalidate_refresh_token(self, refresh_token: str):
-        async with self.postgres_session() as session:
-            await session.execute(
-                delete(db_models.RefreshToken).where(
-                    db_models.RefreshToken.token == refresh_token
-                )
-            )
-            await session.commit()
+    async def invalidate_refresh_token(self, refresh_token: str) -> str | None:
+        """Удаляет refresh-токен и возвращает id его владельца"""
+        if not self.is_refresh_token_signed(refresh_token):
+            return None
+        return await self.refresh_tokens.delete(
+            db_models.RefreshToken.hash_token(refresh_token)
+        )
 
     async def invalidate_user_refresh_tokens(self, user_id: str, exclude_token: str):
-        async with self.postgres_session() as session:
-            await session.execute(
-                delete(db_models.RefreshToken).where(
-                    db_models.RefreshToken.user_id == user_id,
-                    db_models.RefreshToken.token != exclude_token,
-                )
-            )
-            await session.commit()
+        await self.refresh_tokens.delete_user_tokens(
+            user_id, db_models.RefreshToken.hash_token(exclude_token)
+        )
+
+    async def invalidate_access_token(self, token: str, payload: dict) -> None:
+        token_id = self.denylist.token_id(token, payload)
+        await self.denylist.add(token_id, payload["exp"])
+        if self.token_filter:
+            await self.token_filter.publish(token_id)
+
+    async def revoke_user_tokens(self, user_id: str) -> None:
+        """Отзывает все выданные пользователю access-токены"""
+        await token_epochs.bump(self.redis.cache_client, str(user_id))
 
-    async def invalidate_access_token(self, token: str) -> None:
-        await self.redis.put_to_cache(
-            key=token, value=True, ttl=settings.access_token_exp_hours * 3600
+    async def is_access_token_valid(self, token: str, payload: dict) -> bool:
+        (valid,) = await self.are_access_tokens_valid([token], [payload])
+        return valid
+
+    async def are_access_tokens_valid(
+        self, tokens: list[str], payloads: list[dict]
+    ) -> list[bool]:
+        """Проверка списка токенов по эпохам владельцев и denylist"""
+        epochs = await token_epochs.get_many_cached(
+            self.redis.cache_client, [payload["user_id"] for payload in payloads]
         )
+        valid = [
+            payload.get("epoch", 0) >= epoch
+            for payload, epoch in zip(payloads, epochs)
+        ]
+        token_ids = [
+            self.denylist.token_id(token, payload)
+            for token, payload in zip(tokens, payloads)
+        ]
+        # Токены без jti выпущены до его появления: их отзывы могли остаться
+        # под прежним ключом и не попасть в фильтр, поэтому они проверяются всегда
+        legacy = [
+            i for i, payload in enumerate(payloads) if valid[i] and "jti" not in payload
+        ]
+        to_check = [
+            i
+            for i, token_id in enumerate(token_ids)
+            if valid[i]
+            and (
+                i in legacy
+                or not self.token_filter
+                or self.token_filter.might_contain(token_id)
+            )
+        ]
 
-    async def is_access_token_valid(self, token: str) -> bool:
-        invalid_token = await self.redis.get_from_cache(key=token)
-        return False if invalid_token else True
+        revoked = await self.denylist.contains_many(
+            [(token_ids[i], payloads[i]["exp"]) for i in to_check]
+        )
+        legacy_revoked = await self.denylist.contains_legacy(
+            [tokens[i] for i in legacy]
+        )
+        revoked_legacy = {i for i, hit in zip(legacy, legacy_revoked) if hit}
+        for i, is_revoked in zip(to_check, revoked):
+            is_revoked = is_revoked or i in revoked_legacy
+            valid[i] = not is_revoked
+            if (
+                self.token_filter
+                and self.token_filter.ready
+                and not is_revoked
+                and i not in legacy
+            ):
+                self.token_filter.record_false_positive()
+        return valid
 
 
 @lru_cache()
 def get_auth_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
     redis: Redis = Depends(get_redis),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    token_filter: RevokedTokenFilter | None = Depends(get_revoked_token_filter),
+    login_history: LoginHistoryBuffer | None = Depends(get_login_history_buffer),
 ) -> AuthService:
-    return AuthService(postgres_session, redis)
+    refresh_tokens = create_refresh_token_store(
+        settings.refresh_token_store, postgres_session, redis
+    )
+    return AuthService(
+        postgres_session,
+        redis,
+        password_hasher,
+        refresh_tokens,
+        token_filter,
+        login_history,
+    )
@@ -3,11 +3,13 @@ from functools import lru_cache
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from db.postgres import get_postgres_session
+from db.role_catalog import RoleCatalog, get_role_catalog
+from models.associations import user_role
 from models.roles import Role
 from schemas.roles import RoleCreateSchema, RoleSchema
 from services.exceptions import (ObjectAlreadyExistsException,
@@ -37,69 +39,101 @@ class AbstractRoleService(ABC):
 
 
 class RoleService(AbstractRoleService):
-    def __init__(self, postgres_session: AsyncSession):
+    def __init__(
+        self, postgres_session: AsyncSession, catalog: RoleCatalog | None = None
+    ):
         self.postgres_session = postgres_session
+        self.catalog = catalog
 
-    async def get_role_by_id(self, role_id: str) -> Role:
-        """Поиск роли по id"""
+    async def _get_role_from_db(self, role_id: str) -> Role:
         async with self.postgres_session() as session:
             result = await session.scalars(select(Role).filter_by(id=role_id))
             return result.first()
 
+    async def get_role_by_id(self, role_id: str) -> Role:
+        """Поиск роли по id"""
+        if self.catalog:
+            return self.catalog.get(role_id)
+        return await self._get_role_from_db(role_id)
+
     async def get_roles_list(self) -> Role | None:
         """Получение всех ролей"""
+        if self.catalog:
+            return list(self.catalog.list())
+
         async with self.postgres_session() as session:
             result = await session.scalars(select(Role))
             return result.all()
 
+    async def _invalidate_catalog(self) -> None:
+        if self.catalog:
+            await self.catalog.invalidate()
+
     async def create_role(self, role: RoleCreateSchema) -> Role | HTTPException:
         """Создание роли"""
-        new_role = Role(title=role.title)
-
         async with self.postgres_session() as session:
             try:
-                session.add(new_role)
+                new_role = await session.scalar(
+                    insert(Role).values(title=role.title).returning(Role)
+                )
                 await session.commit()
-                await session.refresh(new_role)
-                return new_role
             except IntegrityError:
                 raise ObjectAlreadyExistsException
 
+        await self._invalidate_catalog()
+        return new_role
+
     async def delete_role(self, role_id: str) -> None:
-        """Удаление роли"""
-        role = await self.get_role_by_id(role_id)
+        """Удаление роли вместе с её назначениями пользователям"""
+        assignments = (
+            delete(user_role).where(user_role.c.role_id == role_id).cte("assignments")
+        )
+        async with self.postgres_session() as session:
+            deleted = await session.scalar(
+                delete(Role)
+                .where(Role.id == role_id)
+                .returning(Role.id)
+                .add_cte(assignments)
+            )
+            await session.commit()
 
-        if role is None:
+        if deleted is None:
             raise ObjectNotFoundError
 
-        async with self.postgres_session() as session:
-            await session.delete(role)
-            await session.commit()
+        await self._invalidate_catalog()
 
     async def change_role(
         self, role: RoleCreateSchema, role_id: str
     ) -> Role | HTTPException:
         """Изменение роли"""
-        old_role = await self.get_role_by_id(role_id)
+        # В RETURNING old.title - название до изменения
+        old = select(Role.id, Role.title).where(Role.id == role_id).cte("old")
+        async with self.postgres_session() as session:
+            try:
+                result = await session.execute(
+                    update(Role)
+                    .where(Role.id == old.c.id)
+                    .values(title=role.title)
+                    .returning(Role, old.c.title.label("old_title"))
+                    .add_cte(old)
+                    .execution_options(synchronize_session=False)
+                )
+                row = result.first()
+                await session.commit()
+            except IntegrityError:
+                raise ObjectAlreadyExistsException
 
-        if old_role is None:
+        if row is None:
             raise ObjectNotFoundError
 
-        if old_role.title == role.title:
-            return old_role
-
-        old_role.title = role.title
-
-        async with self.postgres_session() as session:
-            session.add(old_role)
-            await session.commit()
-            await session.refresh(old_role)
-
-            return old_role
+        if row.old_title != role.title:
+            await self._invalidate_catalog()
+        return row.Role
 
 
 @lru_cache()
 def get_role_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    catalog: RoleCatalog | None = Depends(get_role_catalog),
 ) -> RoleService:
-    return RoleService(postgres_session)
+    return RoleService(postgres_session, catalog)
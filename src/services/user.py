@@ -1,21 +1,39 @@
+from datetime import datetime
 from functools import lru_cache
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import select
+from redis.asyncio import Redis
+from sqlalchemy import any_, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 import models as db_models
+from core.config import settings
+from db.page_counter import PageCounter
 from db.postgres import get_postgres_session
+from db.redis import get_redis
+from db.role_catalog import RoleCatalog, get_role_catalog
+from db.user_roles_cache import UserRolesCache
 from schemas.users import CreateUserSchema, UpdateUserSchema
 from services.exceptions import ConflictError, ObjectNotFoundError
+from utils.password_hasher import (HashPriority, PasswordHasher,
+                                   get_password_hasher)
 
 
 class UserService:
-    def __init__(self, postgres_session: AsyncSession):
+    def __init__(
+        self,
+        postgres_session: AsyncSession,
+        password_hasher: PasswordHasher,
+        roles_cache: UserRolesCache | None = None,
+        page_counter: PageCounter | None = None,
+    ):
         self.postgres_session = postgres_session
+        self.password_hasher = password_hasher
+        self.roles_cache = roles_cache
+        self.page_counter = page_counter or PageCounter(None, 0)
 
     async def get_user_by_id(self, user_id: UUID) -> db_models.User:
         async with self.postgres_session() as session:
@@ -25,6 +43,15 @@ class UserService:
 
             return user
 
+    async def get_users_by_ids(self, user_ids: list[UUID]) -> list[db_models.User]:
+        """Пользователи одним запросом, несуществующих в результате нет"""
+        query = select(db_models.User).where(
+            db_models.User.id
+            == any_(literal(user_ids, ARRAY(db_models.User.id.type)))
+        )
+        async with self.postgres_session() as session:
+            return list(await session.scalars(query))
+
     async def get_user_by_login(self, login: str) -> db_models.User:
         async with self.postgres_session() as session:
             results = await session.execute(
@@ -47,6 +74,10 @@ class UserService:
 
             for field in user_data.model_fields_set:
                 val = getattr(user_data, field)
+                if field == "password" and val is not None:
+                    val = await self.password_hasher.hash_password(
+                        val, HashPriority.SIGNUP
+                    )
                 setattr(user, field, val)
 
             try:
@@ -56,29 +87,68 @@ class UserService:
 
             return user
 
-    async def get_user_history(self, user_id: UUID) -> list[db_models.LoginHistory]:
-        async with self.postgres_session() as session:
-            results = await session.execute(
-                select(db_models.User)
-                .where(db_models.User.id == user_id)
-                .options(selectinload(db_models.User.login_history))
+    async def _ensure_user_exists(self, session: AsyncSession, user_id: UUID) -> None:
+        if not await session.scalar(
+            select(db_models.User.id).where(db_models.User.id == user_id)
+        ):
+            raise ObjectNotFoundError
+
+    async def get_user_history(
+        self,
+        user_id: UUID,
+        limit: int,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[db_models.LoginHistory]:
+        """
+        Страница истории входов от новых к старым. after - ключ
+        (event_date, id) последней записи предыдущей страницы, без него
+        страница выбирается по offset.
+        """
+        LoginHistory = db_models.LoginHistory
+        query = (
+            select(LoginHistory)
+            .where(LoginHistory.user_id == user_id)
+            .order_by(LoginHistory.event_date.desc(), LoginHistory.id.desc())
+            .limit(limit)
+        )
+        if after:
+            query = query.where(
+                tuple_(LoginHistory.event_date, LoginHistory.id) < tuple_(*after)
             )
+        else:
+            query = query.offset(offset)
 
-            user = results.scalars().first()
-            if not user:
-                raise ObjectNotFoundError
-
-            login_history = user.login_history
+        async with self.postgres_session() as session:
+            login_history = list(await session.scalars(query))
+            # Пустая страница может означать, что пользователя нет
+            if not login_history:
+                await self._ensure_user_exists(session, user_id)
 
             return login_history
 
+    async def count_user_history(
+        self, user_id: UUID, strategy: str = "exact"
+    ) -> int | None:
+        query = select(db_models.LoginHistory.id).where(
+            db_models.LoginHistory.user_id == user_id
+        )
+        async with self.postgres_session() as session:
+            return await self.page_counter.count(
+                session, query, strategy, cache_key=f"login_history:{user_id}"
+            )
+
     async def create_user(self, user_data: CreateUserSchema) -> db_models.User:
+        password_hash = await self.password_hasher.hash_password(
+            user_data.password, HashPriority.SIGNUP
+        )
         async with self.postgres_session() as session:
             user = db_models.User(
                 login=user_data.login,
-                password=user_data.password,
+                password=password_hash,
                 first_name=user_data.first_name,
                 last_name=user_data.last_name,
+                hashed=True,
             )
             session.add(user)
             try:
@@ -88,20 +158,23 @@ class UserService:
 
             return user
 
-    async def get_user_roles(self, user_id: str) -> list[db_models.Role]:
+    async def get_user_role_titles(self, user_id: str) -> list[str]:
+        """Названия ролей пользователя для выпуска токенов"""
+        if self.roles_cache:
+            titles, stamp = await self.roles_cache.get(user_id)
+            if titles is not None:
+                return titles
+
         async with self.postgres_session() as session:
-            results = await session.execute(
-                select(db_models.User)
-                .where(db_models.User.id == user_id)
-                .options(selectinload(db_models.User.roles))
+            titles = await session.scalar(
+                select(db_models.User.role_titles).where(db_models.User.id == user_id)
             )
-            if not results:
-                raise ObjectNotFoundError
-
-            user = results.scalars().first()
+            if titles is None:
+                return []
 
-            user_roles = user.roles
-            return user_roles
+        if self.roles_cache:
+            await self.roles_cache.put(user_id, titles, stamp)
+        return titles
 
     async def save_login_history(self, user_id) -> None:
         async with self.postgres_session() as session:
@@ -116,5 +189,13 @@ class UserService:
 @lru_cache()
 def get_user_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    redis: Redis = Depends(get_redis),
+    catalog: RoleCatalog | None = Depends(get_role_catalog),
 ) -> UserService:
-    return UserService(postgres_session)
+    roles_cache = None
+    # Без каталога изменения ролей не меняют версию, и кэш не используется
+    if settings.user_roles_cache_enabled and catalog:
+        roles_cache = UserRolesCache(redis, settings.user_roles_cache_ttl)
+    page_counter = PageCounter(redis, settings.pagination_count_cache_seconds)
+    return UserService(postgres_session, password_hasher, roles_cache, page_counter)
@@ -15,3 +15,6 @@ FORBIDDEN_RESPONSE = {"detail": "Forbidden"}
 NOT_AUTHENTICATED_RESPONSE = {"detail": "Not authenticated"}
 
 USER_NOT_FOUND_RESPONSE = {"detail": "user not found"}
+
+# Курсор ["2024-01-01T00:00:00", 5] с числовым id
+NUMERIC_ID_CURSOR = "WyIyMDI0LTAxLTAxVDAwOjAwOjAwIiwgNV0"
@@ -135,7 +135,7 @@ async def refresh_token_moderator(moderator):
         refresh = RefreshToken(
             user_id=moderator.id,
             expires_at=valid_till,
-            token=token,
+            token_hash=RefreshToken.hash_token(token),
         )
         session.add(refresh)
         await session.commit()
@@ -183,6 +183,20 @@ def headers_moderator(access_token_moderator):
     return {"Authorization": f"Bearer {access_token_moderator}"}
 
 
+# Фикстура для заголовков авторизации внутреннего сервиса
+@pytest.fixture(scope="function")
+def headers_service():
+    valid_till = datetime.now() + timedelta(hours=1)
+    payload = {
+        "user_id": str(uuid.uuid4()),
+        "exp": int(valid_till.timestamp()),
+        "roles": settings.internal_service_roles,
+    }
+
+    token = jwt.encode(payload, settings.jwt_secret_key, algorithm=JWT_ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+
 # Фикстура для заголовков авторизации с невалидным access_token админа
 @pytest.fixture(scope="function")
 def headers_admin_invalid(access_token_admin):
@@ -1,8 +1,12 @@
+import pytest
 import redis.asyncio as redis
 
 from core.config import settings
 from db.redis import get_redis
+from db.user_roles_cache import UserRolesCache
 from main import app
+from tests import constants
+from utils.token_epochs import TokenEpochs, token_epochs
 
 
 async def override_get_redis():
@@ -15,3 +19,20 @@ async def override_get_redis():
 
 
 app.dependency_overrides[get_redis] = override_get_redis
+
+# Все тесты ходят с одного адреса, лимиты проверяются отдельными тестами
+settings.rate_limit_enabled = False
+
+
+@pytest.fixture(autouse=True)
+async def reset_user_state():
+    """Эпохи токенов и кэш ролей тестовых пользователей живут в Redis"""
+    redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+    user_ids = (constants.ADMIN_UUID, constants.MODERATOR_UUID)
+    await redis_client.delete(
+        *(TokenEpochs.KEY.format(user_id) for user_id in user_ids),
+        *(UserRolesCache.KEY.format(user_id) for user_id in user_ids),
+        *(UserRolesCache.GENERATION_KEY.format(user_id) for user_id in user_ids),
+    )
+    await redis_client.aclose()
+    token_epochs.clear()
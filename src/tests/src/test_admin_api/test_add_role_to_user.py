@@ -112,3 +112,42 @@ class TestAdminAddRolesApi:
         )
         assert response.status_code == expected_answer["status"]
         assert response.json() == expected_answer["answer"]
+
+    @pytest.mark.asyncio
+    async def test_add_role_revokes_user_tokens(
+        self, async_client, moderator, access_token_moderator, headers_admin, role
+    ):
+        user_info_url = f"/api/v1/users/{moderator.id}"
+        headers_moderator = {"Authorization": f"Bearer {access_token_moderator}"}
+        response = await async_client.get(user_info_url, headers=headers_moderator)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await async_client.post(
+            url=self.endpoint + moderator.id + "/roles",
+            headers=headers_admin,
+            json={"role_id": constants.TEST_ROLE_UUID},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        # Токен со старым списком ролей больше не принимается
+        response = await async_client.get(user_info_url, headers=headers_moderator)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_add_existing_role(self, async_client, moderator, headers_admin):
+        response = await async_client.post(
+            url=self.endpoint + moderator.id + "/roles",
+            headers=headers_admin,
+            json={"role_id": str(moderator.roles[0].id)},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    @pytest.mark.asyncio
+    async def test_add_role_to_missing_user(self, async_client, headers_admin, role):
+        response = await async_client.post(
+            url=self.endpoint + str(uuid4()) + "/roles",
+            headers=headers_admin,
+            json={"role_id": constants.TEST_ROLE_UUID},
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json() == {"detail": "user does not exist"}
@@ -1,7 +1,12 @@
+from uuid import uuid4
+
 import pytest
 from fastapi import status
+from sqlalchemy import delete
 
+from models.associations import user_role
 from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
 
 
 class TestAdminGetRolesApi:
@@ -119,3 +124,100 @@ class TestAdminGetRolesApi:
         )
         assert response.status_code == expected_answer["status"]
         assert response.json() == expected_answer["answer"]
+
+    @pytest.mark.parametrize(
+        "user_id, expected_status, expected_answer",
+        [
+            # пользователь без ролей
+            (constants.ADMIN_UUID, status.HTTP_200_OK, []),
+            # несуществующий пользователь
+            (
+                str(uuid4()),
+                status.HTTP_404_NOT_FOUND,
+                {"detail": "user does not exist"},
+            ),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_user_without_roles_and_missing_user(
+        self,
+        async_client,
+        admin,
+        headers_admin,
+        user_id,
+        expected_status,
+        expected_answer,
+    ):
+        # Роли администратора снимаются, токен уже выпущен
+        async with async_session_maker() as session:
+            await session.execute(
+                delete(user_role).where(user_role.c.user_id == constants.ADMIN_UUID)
+            )
+            await session.commit()
+
+        response = await async_client.get(
+            url=self.endpoint + user_id + "/roles",
+            headers=headers_admin,
+        )
+        assert response.status_code == expected_status
+        assert response.json() == expected_answer
+
+    @pytest.mark.asyncio
+    async def test_page_total(
+        self, async_client, moderator, add_test_role_to_moderator, headers_admin, role
+    ):
+        response = await async_client.get(
+            url=self.endpoint + moderator.id + "/roles",
+            headers=headers_admin,
+            params={"page": 1, "size": 1},
+        )
+        response_data = response.json()
+        assert response_data["total"] == 2
+        assert response_data["has_next"] is True
+        assert response_data["items"] == [
+            {"id": str(moderator.roles[0].id), "title": "moderator"}
+        ]
+
+
+class TestAdminGetUsersRolesApi:
+    def setup_method(self):
+        self.endpoint = "/api/v1/users/roles/batch"
+
+    @pytest.mark.asyncio
+    async def test_batch(
+        self, async_client, admin, moderator, add_test_role_to_moderator, headers_admin
+    ):
+        missing_id = str(uuid4())
+        response = await async_client.post(
+            url=self.endpoint,
+            headers=headers_admin,
+            json={
+                "user_ids": [
+                    constants.MODERATOR_UUID,
+                    constants.ADMIN_UUID,
+                    missing_id,
+                ]
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert response_data["not_found"] == [missing_id]
+        titles = {
+            user_id: [role["title"] for role in roles]
+            for user_id, roles in response_data["roles"].items()
+        }
+        assert titles == {
+            constants.MODERATOR_UUID: ["moderator", "new role"],
+            constants.ADMIN_UUID: ["admin"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_batch_forbidden(self, async_client, moderator, headers_moderator):
+        response = await async_client.post(
+            url=self.endpoint,
+            headers=headers_moderator,
+            json={"user_ids": [constants.MODERATOR_UUID]},
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+
+from models.user import User
+from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
+
+
+@pytest.fixture
+async def listed_users(admin, moderator):
+    # Пользователи с разным временем создания, от старых к новым
+    created = datetime.now() - timedelta(days=10)
+    async with async_session_maker() as session:
+        for i, login in enumerate(["list_a", "list_b", "list%_c"]):
+            user = User(login=login, password="pass", first_name="F", last_name="L")
+            user.email = f"{login.replace('%', '')}@example.com"
+            user.created_at = created + timedelta(days=i)
+            session.add(user)
+        await session.commit()
+
+
+class TestAdminListUsersApi:
+    def setup_method(self):
+        self.endpoint = "/api/v1/users/"
+
+    @pytest.mark.parametrize(
+        "filters, expected_logins",
+        [
+            # префикс логина, подстановочные символы экранируются
+            ({"login_prefix": "list"}, ["list%_c", "list_b", "list_a"]),
+            ({"login_prefix": "list%"}, ["list%_c"]),
+            # email без учёта регистра
+            ({"email": "LIST_B@example.com"}, ["list_b"]),
+            # роль
+            ({"role": "moderator"}, [constants.MODERATOR_LOGIN]),
+            # интервал создания
+            (
+                {
+                    "login_prefix": "list",
+                    "created_to": (datetime.now() - timedelta(days=9)).isoformat(),
+                },
+                ["list_a"],
+            ),
+            # время с часовым поясом
+            (
+                {
+                    "login_prefix": "list",
+                    "created_from": (
+                        datetime.now(timezone.utc) - timedelta(days=9, hours=12)
+                    ).isoformat(),
+                },
+                ["list%_c", "list_b"],
+            ),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_filters(
+        self, async_client, listed_users, headers_admin, filters, expected_logins
+    ):
+        response = await async_client.get(
+            url=self.endpoint, headers=headers_admin, params=filters
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["login"] for user in response.json()["items"]] == expected_logins
+
+    @pytest.mark.asyncio
+    async def test_cursor_walk_with_roles(
+        self, async_client, listed_users, headers_admin
+    ):
+        logins, roles, cursor = [], {}, None
+        while True:
+            params = {"size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await async_client.get(
+                url=self.endpoint, headers=headers_admin, params=params
+            )
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            for user in page["items"]:
+                logins.append(user["login"])
+                roles[user["login"]] = [role["title"] for role in user["roles"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert sorted(logins) == sorted(
+            [
+                constants.ADMIN_LOGIN,
+                constants.MODERATOR_LOGIN,
+                "list_a",
+                "list_b",
+                "list%_c",
+            ]
+        )
+        assert roles[constants.ADMIN_LOGIN] == ["admin"]
+        assert roles[constants.MODERATOR_LOGIN] == ["moderator"]
+        assert roles["list_a"] == []
+
+    @pytest.mark.parametrize("cursor", ["bad", constants.NUMERIC_ID_CURSOR])
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, async_client, headers_admin, cursor):
+        response = await async_client.get(
+            url=self.endpoint, headers=headers_admin, params={"cursor": cursor}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.asyncio
+    async def test_forbidden(self, async_client, headers_moderator):
+        response = await async_client.get(url=self.endpoint, headers=headers_moderator)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -111,3 +111,14 @@ class TestAdminRemoveRolesApi:
         )
         assert response.status_code == expected_answer["status"]
         assert response.json() == expected_answer["answer"]
+
+    @pytest.mark.asyncio
+    async def test_delete_role_from_missing_user(
+        self, async_client, headers_admin, role
+    ):
+        response = await async_client.delete(
+            url=self.endpoint + str(uuid4()) + "/roles/" + constants.TEST_ROLE_UUID,
+            headers=headers_admin,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json() == {"detail": "user does not exist"}
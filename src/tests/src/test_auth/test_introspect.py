@@ -0,0 +1,82 @@
+import pytest
+from fastapi import status
+
+from core.config import settings
+
+
+class TestAuthIntrospect:
+    def setup_method(self):
+        self.endpoint = "/api/v1/auth/introspect"
+
+    @pytest.mark.asyncio
+    async def test_introspect(
+        self,
+        async_client,
+        access_token_admin,
+        access_token_moderator,
+        refresh_token_moderator,
+        headers_service,
+    ):
+        # Отзываем токен модератора
+        logout_response = await async_client.post(
+            "/api/v1/auth/logout",
+            json={
+                "access_token": access_token_moderator,
+                "refresh_token": refresh_token_moderator,
+            },
+        )
+        assert logout_response.status_code == status.HTTP_200_OK
+
+        response = await async_client.post(
+            self.endpoint,
+            headers=headers_service,
+            json={
+                "tokens": [
+                    access_token_admin,
+                    access_token_moderator,
+                    access_token_admin[::-1],
+                    refresh_token_moderator,
+                ]
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == [
+            "active",
+            "revoked",
+            "invalid",
+            "invalid",
+        ]
+        assert results[0]["active"] is True
+        assert results[0]["claims"]["roles"] == ["admin"]
+        assert results[1]["claims"] is None
+
+    @pytest.mark.parametrize(
+        "tokens",
+        [[], ["token"] * (settings.introspect_max_tokens + 1)],
+    )
+    @pytest.mark.asyncio
+    async def test_introspect_failed_by_data(
+        self, async_client, headers_service, tokens
+    ):
+        response = await async_client.post(
+            self.endpoint, headers=headers_service, json={"tokens": tokens}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_introspect_unauthorized(self, async_client, access_token_admin):
+        response = await async_client.post(
+            self.endpoint, json={"tokens": [access_token_admin]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_introspect_forbidden(
+        self, async_client, access_token_admin, headers_admin
+    ):
+        response = await async_client.post(
+            self.endpoint, headers=headers_admin, json={"tokens": [access_token_admin]}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,15 @@
+import pytest
+from fastapi import status
+
+
+class TestJWKS:
+    def setup_method(self):
+        self.endpoint = "/.well-known/jwks.json"
+
+    @pytest.mark.asyncio
+    async def test_jwks(self, async_client):
+        response = await async_client.get(self.endpoint)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "keys" in response.json()
+        assert "max-age" in response.headers["cache-control"]
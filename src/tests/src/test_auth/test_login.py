@@ -1,6 +1,7 @@
 import pytest
 from fastapi import status
 
+from api.auth_utils import decode_token
 from tests import constants
 
 
@@ -24,6 +25,8 @@ class TestAuthLogin:
         for field in ("access_token", "refresh_token"):
             assert field in response_data
 
+        assert decode_token(response_data["access_token"])["roles"] == ["moderator"]
+
         # Проверяем историю логинов пользователя
 
         login_history_url = f"/api/v1/users/{moderator.id}/login_history"
@@ -36,6 +39,24 @@ class TestAuthLogin:
         )
 
         assert login_history_response.status_code == status.HTTP_200_OK
+        assert len(login_history_response.json()["items"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_login_recorded(
+        self, async_client, moderator, access_token_moderator
+    ):
+        login_response = await async_client.post(
+            url=self.endpoint,
+            json={"login": constants.MODERATOR_LOGIN, "password": "wrong_password"},
+        )
+        assert login_response.status_code == status.HTTP_400_BAD_REQUEST
+
+        login_history_response = await async_client.get(
+            f"/api/v1/users/{moderator.id}/login_history",
+            headers={"Authorization": f"Bearer {access_token_moderator}"},
+        )
+        items = login_history_response.json()["items"]
+        assert [item["success"] for item in items] == [False]
 
     @pytest.mark.parametrize(
         "user_data, expected_status, expected_fields",
@@ -2,9 +2,11 @@ from time import sleep
 from uuid import uuid4
 
 import pytest
+import redis.asyncio as redis
 from fastapi import status
 from sqlalchemy.sql import select
 
+from core.config import settings
 from models import RefreshToken
 from tests import constants
 from tests.fixtures.db_fixtures import async_session_maker
@@ -41,6 +43,24 @@ class TestAuthLogout:
         )
         assert response2.status_code == status.HTTP_200_OK
 
+    @pytest.mark.asyncio
+    async def test_revoked_before_jti_stays_revoked(
+        self, async_client, moderator, access_token_moderator
+    ):
+        # До появления jti отзыв хранился под ключом, равным самому токену
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        await redis_client.set(access_token_moderator, "true", ex=60)
+        try:
+            response = await async_client.get(
+                f"/api/v1/users/{moderator.id}",
+                headers={"Authorization": f"Bearer {access_token_moderator}"},
+            )
+        finally:
+            await redis_client.delete(access_token_moderator)
+            await redis_client.aclose()
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     @pytest.mark.asyncio
     async def test_logout_all(
         self, async_client, moderator, access_token_moderator, refresh_token_moderator
@@ -91,7 +111,16 @@ class TestAuthLogout:
             user_refresh_tokens = result1.all()
 
         assert len(user_refresh_tokens) == 1
-        assert user_refresh_tokens[0].token == refresh_token_moderator
+        assert user_refresh_tokens[0].token_hash == RefreshToken.hash_token(
+            refresh_token_moderator
+        )
+
+        # Все выданные ранее access-токены отозваны
+        user_info_response = await async_client.get(
+            f"/api/v1/users/{moderator.id}",
+            headers={"Authorization": f"Bearer {access_token_moderator}"},
+        )
+        assert user_info_response.status_code == status.HTTP_401_UNAUTHORIZED
 
     @pytest.mark.parametrize(
         "token_data, expected_status",
@@ -0,0 +1,98 @@
+import ipaddress
+import uuid
+
+import pytest
+import redis.asyncio as redis
+from fastapi import status
+from starlette.requests import Request
+
+from api.rate_limit import acquire, client_ip
+from core.config import DEFAULT_RATE_LIMITS, Settings, settings
+
+
+def make_request(peer: str, headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": (peer, 12345),
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+class TestRateLimit:
+    @pytest.mark.asyncio
+    async def test_all_buckets_must_have_tokens(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        ip_key, login_key = f"test:{uuid.uuid4()}", f"test:{uuid.uuid4()}"
+        try:
+            for _ in range(3):
+                assert await acquire(redis_client, [ip_key], 3, 60) == 0
+
+            # Пустая корзина по IP не даёт списать токен из корзины по логину
+            assert await acquire(redis_client, [login_key, ip_key], 3, 60) > 0
+            tokens = await redis_client.hget(login_key, "tokens")
+            assert tokens is None
+
+            assert await acquire(redis_client, [login_key], 3, 60) == 0
+            assert 0 < await redis_client.pttl(login_key) <= 60_000
+        finally:
+            await redis_client.delete(ip_key, login_key)
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_login_limited(self, async_client, monkeypatch):
+        monkeypatch.setattr(settings, "rate_limit_enabled", True)
+        capacity = int(settings.rate_limits["login"].split("/")[0])
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        await redis_client.delete("rate_limit:login:ip:127.0.0.1")
+        login = f"user-{uuid.uuid4()}"
+        try:
+            for _ in range(capacity):
+                response = await async_client.post(
+                    "/api/v1/auth/login", json={"login": login, "password": "pass"}
+                )
+                assert response.status_code == status.HTTP_404_NOT_FOUND
+
+            response = await async_client.post(
+                "/api/v1/auth/login", json={"login": login, "password": "pass"}
+            )
+            assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+            assert int(response.headers["Retry-After"]) > 0
+        finally:
+            await redis_client.delete(
+                "rate_limit:login:ip:127.0.0.1", f"rate_limit:login:login:{login}"
+            )
+            await redis_client.aclose()
+
+    @pytest.mark.parametrize(
+        "peer, headers, expected_ip",
+        [
+            # заголовки от недоверенного адреса игнорируются
+            ("203.0.113.5", {"X-Forwarded-For": "198.51.100.1"}, "203.0.113.5"),
+            # nginx дописывает адрес клиента в конец
+            ("172.18.0.3", {"X-Forwarded-For": "198.51.100.1"}, "198.51.100.1"),
+            # подделанные адреса левее клиента не учитываются
+            (
+                "172.18.0.3",
+                {"X-Forwarded-For": "10.0.0.1, 198.51.100.1"},
+                "198.51.100.1",
+            ),
+            ("172.18.0.3", {"X-Real-IP": "198.51.100.2"}, "198.51.100.2"),
+            ("172.18.0.3", {}, "172.18.0.3"),
+        ],
+    )
+    def test_client_ip_behind_proxy(self, monkeypatch, peer, headers, expected_ip):
+        monkeypatch.setattr(
+            settings, "trusted_proxies", [ipaddress.ip_network("172.16.0.0/12")]
+        )
+
+        assert client_ip(make_request(peer, headers)) == expected_ip
+
+    def test_partial_rate_limits_keep_defaults(self):
+        custom = Settings(_env_file=None, RATE_LIMITS={"login": "1/60"})
+
+        assert custom.rate_limits == {**DEFAULT_RATE_LIMITS, "login": "1/60"}
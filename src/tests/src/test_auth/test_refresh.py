@@ -1,8 +1,14 @@
+from datetime import datetime, timedelta
 from uuid import uuid4
 
+import jwt
 import pytest
 from fastapi import status
 
+from core.config import JWT_ALGORITHM, settings
+from models import RefreshToken
+from tests.fixtures.db_fixtures import async_session_maker
+
 
 class TestAuthRefresh:
     def setup_method(self):
@@ -38,6 +44,26 @@ class TestAuthRefresh:
         assert "access_token" in response2_data
         assert "refresh_token" in response2_data
 
+        # Повторное использование старого refresh-токена
+        response3 = await async_client.post(
+            self.endpoint,
+            json={
+                "access_token": response2_data["access_token"],
+                "refresh_token": refresh_token_moderator,
+            },
+        )
+        assert response3.status_code == status.HTTP_401_UNAUTHORIZED
+
+        # Новый refresh-токен после ротации действителен
+        response4 = await async_client.post(
+            self.endpoint,
+            json={
+                "access_token": response2_data["access_token"],
+                "refresh_token": response2_data["refresh_token"],
+            },
+        )
+        assert response4.status_code == status.HTTP_200_OK
+
     @pytest.mark.parametrize(
         "token_data, expected_status",
         [
@@ -61,3 +87,44 @@ class TestAuthRefresh:
     ):
         response = await async_client.post(self.endpoint, json=token_data)
         assert response.status_code == expected_status
+
+    @pytest.mark.parametrize(
+        "secret, exp_delta",
+        [
+            # подпись чужим ключом
+            ("another_secret_key", timedelta(hours=1)),
+            # истёкший JWT, запись в хранилище ещё действует
+            (settings.jwt_secret_key, -timedelta(hours=1)),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_refresh_jwt_is_verified_before_lookup(
+        self, async_client, moderator, access_token_moderator, secret, exp_delta
+    ):
+        refresh_token = jwt.encode(
+            {
+                "user_id": str(moderator.id),
+                "exp": int((datetime.now() + exp_delta).timestamp()),
+                "typ": "refresh",
+            },
+            secret,
+            algorithm=JWT_ALGORITHM,
+        )
+        async with async_session_maker() as session:
+            session.add(
+                RefreshToken(
+                    user_id=moderator.id,
+                    token_hash=RefreshToken.hash_token(refresh_token),
+                    expires_at=datetime.now() + timedelta(days=1),
+                )
+            )
+            await session.commit()
+
+        response = await async_client.post(
+            self.endpoint,
+            json={
+                "access_token": access_token_moderator,
+                "refresh_token": refresh_token,
+            },
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
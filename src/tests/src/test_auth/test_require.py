@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Annotated
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI, status
+from httpx import ASGITransport, AsyncClient
+
+from api.auth_utils import AuthContext, Require
+from core.config import JWT_ALGORITHM, settings
+from services.auth import get_auth_service
+
+
+class StubAuthService:
+    def __init__(self, valid: bool):
+        self.valid = valid
+        self.checks = 0
+
+    async def is_access_token_valid(self, token, payload) -> bool:
+        self.checks += 1
+        return self.valid
+
+
+def make_token(user_id: str, roles: list[str]) -> str:
+    payload = {
+        "user_id": user_id,
+        "exp": int((datetime.now() + timedelta(hours=1)).timestamp()),
+        "roles": roles,
+    }
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=JWT_ALGORITHM)
+
+
+def make_app(auth_service: StubAuthService) -> FastAPI:
+    app = FastAPI()
+    app.dependency_overrides[get_auth_service] = lambda: auth_service
+
+    # Обе зависимости разделяют один разбор токена и одну проверку отзыва
+    moderator_only = Require(roles={"moderator"})
+    staff_or_self = Require(roles={"admin", "moderator"}, self_param="user_id")
+
+    @app.get("/users/{user_id}", dependencies=[Depends(moderator_only)])
+    async def handler(
+        user_id: uuid.UUID, auth: Annotated[AuthContext, Depends(staff_or_self)]
+    ):
+        return {"user_id": auth.user_id, "roles": sorted(auth.roles)}
+
+    return app
+
+
+class TestRequire:
+    @pytest.mark.parametrize(
+        "roles, own_profile, valid, expected_status",
+        [
+            (["moderator"], False, True, status.HTTP_200_OK),
+            (["admin"], True, True, status.HTTP_403_FORBIDDEN),
+            (["user"], False, True, status.HTTP_403_FORBIDDEN),
+            (["moderator"], False, False, status.HTTP_401_UNAUTHORIZED),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_route(self, roles, own_profile, valid, expected_status):
+        auth_service = StubAuthService(valid)
+        user_id = str(uuid.uuid4())
+        path_id = user_id if own_profile else str(uuid.uuid4())
+        token = make_token(user_id, roles)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=make_app(auth_service)), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                f"/users/{path_id}", headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == expected_status
+        # Отзыв проверяется не больше одного раза за запрос
+        assert auth_service.checks == (
+            0 if expected_status == status.HTTP_403_FORBIDDEN else 1
+        )
+        if expected_status == status.HTTP_200_OK:
+            assert response.json() == {"user_id": user_id, "roles": roles}
+
+    @pytest.mark.asyncio
+    async def test_self_access(self):
+        auth_service = StubAuthService(valid=True)
+        app = FastAPI()
+        app.dependency_overrides[get_auth_service] = lambda: auth_service
+        require_self = Require(roles={"admin"}, self_param="user_id")
+
+        @app.get("/users/{user_id}", dependencies=[Depends(require_self)])
+        async def handler(user_id: uuid.UUID):
+            return {}
+
+        user_id = uuid.uuid4()
+        headers = {"Authorization": f"Bearer {make_token(str(user_id), [])}"}
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            own = await client.get(f"/users/{str(user_id).upper()}", headers=headers)
+            other = await client.get(f"/users/{uuid.uuid4()}", headers=headers)
+            invalid = await client.get(
+                f"/users/{user_id}", headers={"Authorization": "Bearer invalid"}
+            )
+
+        assert own.status_code == status.HTTP_200_OK
+        assert other.status_code == status.HTTP_403_FORBIDDEN
+        assert invalid.status_code == status.HTTP_401_UNAUTHORIZED
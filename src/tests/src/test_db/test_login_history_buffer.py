@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from db.login_history_buffer import LoginHistoryBuffer
+from models import LoginHistory
+from tests.fixtures.db_fixtures import async_session_maker
+
+
+class TestLoginHistoryBuffer:
+    def make_buffer(self, max_size=10):
+        return LoginHistoryBuffer(
+            async_session_maker, batch_size=3, flush_interval=60, max_size=max_size
+        )
+
+    async def get_history(self, user_id):
+        async with async_session_maker() as session:
+            results = await session.scalars(
+                select(LoginHistory).where(LoginHistory.user_id == user_id)
+            )
+            return results.all()
+
+    @pytest.mark.asyncio
+    async def test_flush_in_batches(self, moderator):
+        buffer = self.make_buffer()
+        for success in (True, False, True, True, False):
+            buffer.record(moderator.id, success)
+
+        assert await self.get_history(moderator.id) == []
+
+        await buffer.flush()
+
+        history = await self.get_history(moderator.id)
+        assert len(history) == 5
+        assert sum(not event.success for event in history) == 2
+        assert buffer.stats()["flushes"] == 2
+        assert buffer.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_overflow_and_drain_on_close(self, moderator):
+        buffer = self.make_buffer(max_size=2)
+        buffer.start()
+        for _ in range(4):
+            buffer.record(moderator.id, True)
+
+        await buffer.close()
+
+        assert len(await self.get_history(moderator.id)) == 2
+        assert buffer.stats()["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_background_flush_survives_errors(self, moderator):
+        failures = [OSError("connection reset")]
+
+        def session_maker():
+            if failures:
+                raise failures.pop()
+            return async_session_maker()
+
+        buffer = LoginHistoryBuffer(
+            session_maker, batch_size=3, flush_interval=60, max_size=10
+        )
+        buffer.start()
+
+        async def wait_for(metric, value):
+            while buffer.stats()[metric] < value:
+                await asyncio.sleep(0.01)
+
+        for _ in range(3):
+            buffer.record(moderator.id, True)
+        await asyncio.wait_for(wait_for("failed", 3), timeout=5)
+
+        for _ in range(3):
+            buffer.record(moderator.id, True)
+        await asyncio.wait_for(wait_for("flushed", 3), timeout=5)
+
+        assert not buffer._task.done()
+        await buffer.close()
+        assert len(await self.get_history(moderator.id)) == 3
@@ -0,0 +1,39 @@
+import pytest
+import redis.asyncio as redis
+from sqlalchemy import select
+
+from core.config import settings
+from db.page_counter import PageCounter
+from models import LoginHistory, User
+from tests.fixtures.db_fixtures import async_session_maker
+
+
+class TestPageCounter:
+    @pytest.mark.asyncio
+    async def test_strategies(self, moderator, login_multiple_times):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        counter = PageCounter(redis_client, cache_seconds=60)
+        query = select(LoginHistory.id).where(LoginHistory.user_id == moderator.id)
+        cache_key = f"test:{moderator.id}"
+        try:
+            async with async_session_maker() as session:
+                assert await counter.count(session, query, "exact") == 5
+                assert await counter.count(session, query, "none") is None
+                assert await counter.count(session, query, "estimated") >= 0
+
+                assert await counter.count(session, query, "cached", cache_key) == 5
+                # До истечения кэша новая запись не учитывается
+                session.add(LoginHistory(user_id=moderator.id, success=True))
+                await session.commit()
+                assert await counter.count(session, query, "cached", cache_key) == 5
+                assert await counter.count(session, query, "exact") == 6
+        finally:
+            await redis_client.delete(counter.KEY.format(cache_key))
+            await redis_client.aclose()
+
+    @pytest.mark.parametrize("pattern", ["%a :b%", "100%%", "it's"])
+    @pytest.mark.asyncio
+    async def test_estimate_with_string_parameters(self, moderator, pattern):
+        query = select(User.id).where(User.login.ilike(pattern))
+        async with async_session_maker() as session:
+            assert await PageCounter.estimate(session, query) >= 0
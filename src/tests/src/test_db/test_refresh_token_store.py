@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import redis.asyncio as redis
+
+from core.config import settings
+from db.refresh_token_store import RedisRefreshTokenStore
+
+
+class TestRedisRefreshTokenStore:
+    @pytest.mark.asyncio
+    async def test_rotate_once(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        store = RedisRefreshTokenStore(redis_client)
+        user_id = str(uuid.uuid4())
+        expires_at = datetime.now() + timedelta(days=1)
+        try:
+            await store.save(user_id, "old", expires_at)
+            assert await store.get_user("old") == user_id
+            assert 0 < await redis_client.ttl("refresh_token:old") <= 86400
+
+            assert await store.rotate(user_id, "old", "mid", expires_at)
+            assert not await store.rotate(user_id, "old", "reused", expires_at)
+
+            results = await asyncio.gather(
+                store.rotate(user_id, "mid", "new-1", expires_at),
+                store.rotate(user_id, "mid", "new-2", expires_at),
+            )
+
+            assert sorted(results) == [False, True]
+            assert await store.get_user("old") is None
+            assert await store.get_user("mid") is None
+            new_hash = "new-1" if results[0] else "new-2"
+            assert await store.get_user(new_hash) == user_id
+            members = await redis_client.smembers(f"user_refresh_tokens:{user_id}")
+            assert members == {new_hash.encode()}
+        finally:
+            await redis_client.delete(
+                "refresh_token:mid",
+                "refresh_token:new-1",
+                "refresh_token:new-2",
+                f"user_refresh_tokens:{user_id}",
+            )
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_rotate_foreign_token(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        store = RedisRefreshTokenStore(redis_client)
+        user_id = str(uuid.uuid4())
+        expires_at = datetime.now() + timedelta(days=1)
+        try:
+            await store.save(user_id, "owned", expires_at)
+
+            assert not await store.rotate(str(uuid.uuid4()), "owned", "x", expires_at)
+            assert await store.get_user("owned") == user_id
+        finally:
+            await redis_client.delete(
+                "refresh_token:owned", f"user_refresh_tokens:{user_id}"
+            )
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_delete(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        store = RedisRefreshTokenStore(redis_client)
+        user_id = str(uuid.uuid4())
+        expires_at = datetime.now() + timedelta(days=1)
+        try:
+            for token_hash in ("a", "b", "c"):
+                await store.save(user_id, token_hash, expires_at)
+
+            assert await store.delete("a") == user_id
+            assert await store.delete("a") is None
+
+            await store.delete_user_tokens(user_id, exclude_hash="c")
+
+            assert await store.get_user("b") is None
+            assert await store.get_user("c") == user_id
+            members = await redis_client.smembers(f"user_refresh_tokens:{user_id}")
+            assert members == {b"c"}
+        finally:
+            await redis_client.delete(
+                "refresh_token:c", f"user_refresh_tokens:{user_id}"
+            )
+            await redis_client.aclose()
@@ -0,0 +1,63 @@
+import dataclasses
+
+import pytest
+import redis.asyncio as redis
+
+from core.config import settings
+from db.role_catalog import RoleCatalog
+from schemas.roles import RoleCreateSchema
+from services.role import RoleService
+from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
+
+
+class TestRoleCatalog:
+    @pytest.mark.asyncio
+    async def test_snapshot(self, admin):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        catalog = RoleCatalog(async_session_maker, redis_client, poll_seconds=1)
+        try:
+            await catalog.load()
+
+            role = catalog.get(constants.ROLE_ADMIN_UUID)
+            assert role.title == constants.ROLE_ADMIN_TITLE
+            assert catalog.get_by_title(constants.ROLE_ADMIN_TITLE) is role
+            assert catalog.get("not-a-uuid") is None
+            assert list(catalog.list()) == [role]
+
+            with pytest.raises(dataclasses.FrozenInstanceError):
+                role.title = "changed"
+            with pytest.raises(TypeError):
+                catalog.snapshot.by_title["changed"] = role
+        finally:
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_version_invalidation(self, admin):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        worker_1 = RoleCatalog(async_session_maker, redis_client, poll_seconds=1)
+        worker_2 = RoleCatalog(async_session_maker, redis_client, poll_seconds=1)
+        try:
+            await worker_1.load()
+            await worker_2.load()
+
+            role_service = RoleService(async_session_maker, worker_1)
+            new_role = await role_service.create_role(RoleCreateSchema(title="editor"))
+
+            # Изменивший роли воркер видит их сразу, остальные - после опроса
+            assert (
+                await role_service.get_role_by_id(str(new_role.id))
+            ).title == "editor"
+            assert worker_2.get(new_role.id) is None
+            await worker_2.refresh()
+            assert worker_2.get_by_title("editor").id == new_role.id
+
+            snapshot = worker_2.snapshot
+            await worker_2.refresh()
+            assert worker_2.snapshot is snapshot
+
+            await role_service.delete_role(str(new_role.id))
+            await worker_2.refresh()
+            assert worker_2.get(new_role.id) is None
+        finally:
+            await redis_client.aclose()
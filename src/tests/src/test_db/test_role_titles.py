@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from models.associations import user_role
+from models.roles import Role
+from models.user import User
+from services.admin import AdminService
+from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
+from utils.role_titles import find_stale_role_titles
+
+
+async def get_role_titles(user_id) -> list[str]:
+    async with async_session_maker() as session:
+        return await session.scalar(select(User.role_titles).where(User.id == user_id))
+
+
+class TestRoleTitles:
+    @pytest.mark.asyncio
+    async def test_triggers_keep_titles_in_sync(self, moderator, role):
+        admin_service = AdminService(async_session_maker)
+        assert await get_role_titles(moderator.id) == ["moderator"]
+
+        await admin_service.add_user_role(moderator.id, constants.TEST_ROLE_UUID)
+        assert await get_role_titles(moderator.id) == ["moderator", "new role"]
+
+        async with async_session_maker() as session:
+            await session.execute(
+                update(Role)
+                .where(Role.id == constants.TEST_ROLE_UUID)
+                .values(title="renamed role")
+            )
+            await session.commit()
+        assert await get_role_titles(moderator.id) == ["moderator", "renamed role"]
+
+        await admin_service.remove_user_role(moderator.id, constants.TEST_ROLE_UUID)
+        assert await get_role_titles(moderator.id) == ["moderator"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_assignments_are_not_lost(self, admin, moderator, role):
+        first = async_session_maker()
+        second = async_session_maker()
+        try:
+            await first.execute(
+                insert(user_role).values(
+                    user_id=moderator.id, role_id=constants.TEST_ROLE_UUID
+                )
+            )
+            # Вторая транзакция ждёт блокировку строки users до коммита первой
+            second_insert = asyncio.create_task(
+                second.execute(
+                    insert(user_role).values(
+                        user_id=moderator.id, role_id=constants.ROLE_ADMIN_UUID
+                    )
+                )
+            )
+            await asyncio.sleep(0.2)
+            assert not second_insert.done()
+
+            await first.commit()
+            await second_insert
+            await second.commit()
+        finally:
+            await first.close()
+            await second.close()
+
+        assert await get_role_titles(moderator.id) == [
+            "admin",
+            "moderator",
+            "new role",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_check_finds_and_fixes_drift(self, admin, moderator):
+        async with async_session_maker() as session:
+            await session.execute(
+                update(User)
+                .where(User.id == moderator.id)
+                .values(role_titles=["admin"])
+            )
+            await session.commit()
+
+        assert await find_stale_role_titles(async_session_maker, 1) == [uuid.UUID(moderator.id)]
+        assert await get_role_titles(moderator.id) == ["admin"]
+
+        assert await find_stale_role_titles(async_session_maker, 1, fix=True) == [
+            uuid.UUID(moderator.id)
+        ]
+        assert await get_role_titles(moderator.id) == ["moderator"]
+        assert await find_stale_role_titles(async_session_maker, 1) == []
@@ -0,0 +1,59 @@
+import time
+import uuid
+
+import pytest
+import redis.asyncio as redis
+
+from core.config import settings
+from db.token_denylist import TokenDenylist
+
+
+class TestTokenDenylist:
+    def test_token_id(self):
+        assert TokenDenylist.token_id("a.b.c", {"jti": "abc"}) == "abc"
+        legacy_id = TokenDenylist.token_id("a.b.c", {})
+        assert len(legacy_id) == 24
+        assert legacy_id != TokenDenylist.token_id("a.b.d", {})
+
+    @pytest.mark.asyncio
+    async def test_key_per_token(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        denylist = TokenDenylist(redis_client)
+        revoked, other = str(uuid.uuid4()), str(uuid.uuid4())
+        exp = int(time.time()) + 600
+        try:
+            await denylist.add(revoked, exp)
+            await denylist.add(other, int(time.time()) - 1)
+
+            assert await denylist.contains_many([(revoked, exp), (other, exp)]) == [
+                True,
+                False,
+            ]
+            assert (
+                590 <= await redis_client.ttl(TokenDenylist.KEY.format(revoked)) <= 600
+            )
+        finally:
+            await redis_client.delete(TokenDenylist.KEY.format(revoked))
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_buckets(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        denylist = TokenDenylist(redis_client, bucket_seconds=300)
+        exp = int(time.time()) + 600
+        token_ids = [str(uuid.uuid4()) for _ in range(3)]
+        bucket_key = TokenDenylist.BUCKET_KEY.format(exp // 300)
+        try:
+            for token_id in token_ids[:2]:
+                await denylist.add(token_id, exp)
+
+            assert await denylist.contains(token_ids[0], exp)
+            assert not await denylist.contains(token_ids[2], exp)
+            # Запись ищется только в интервале своего exp
+            assert not await denylist.contains(token_ids[0], exp + 300)
+
+            assert await redis_client.scard(bucket_key) == 2
+            assert 0 < await redis_client.ttl(bucket_key) <= 900
+        finally:
+            await redis_client.delete(bucket_key)
+            await redis_client.aclose()
@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+
+import pytest
+import redis.asyncio as redis
+
+from core.config import settings
+from db.token_filter import BloomFilter, RevokedTokenFilter
+
+
+def make_filter(redis_client):
+    return RevokedTokenFilter(
+        redis_client,
+        ttl=3600,
+        capacity=1000,
+        error_rate=0.01,
+        max_memory_bytes=64 * 1024,
+        rebuild_seconds=60,
+    )
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01, 64 * 1024)
+        tokens = [str(uuid.uuid4()) for _ in range(1000)]
+        for token in tokens:
+            bloom.add(token)
+
+        assert all(token in bloom for token in tokens)
+
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+        assert false_positives < 300
+
+    def test_memory_budget(self):
+        bloom = BloomFilter.for_capacity(1_000_000, 0.001, 1024)
+        assert len(bloom.bits) <= 1024
+
+
+class TestRevokedTokenFilter:
+    def test_not_ready_falls_through(self):
+        token_filter = make_filter(redis_client=None)
+        assert token_filter.might_contain("token")
+
+    @pytest.mark.asyncio
+    async def test_sync_between_workers(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        await redis_client.delete(RevokedTokenFilter.STREAM_KEY)
+
+        publisher = make_filter(redis_client)
+        await publisher.publish("revoked-before-start")
+
+        subscriber = make_filter(redis_client)
+        sync = asyncio.create_task(subscriber.run())
+        try:
+            for _ in range(50):
+                if subscriber.ready:
+                    break
+                await asyncio.sleep(0.05)
+
+            assert subscriber.might_contain("revoked-before-start")
+            assert not subscriber.might_contain("never-revoked")
+
+            await publisher.publish("revoked-after-start")
+            for _ in range(50):
+                if subscriber.bloom.items == 2:
+                    break
+                await asyncio.sleep(0.05)
+
+            assert subscriber.might_contain("revoked-after-start")
+            assert subscriber.stats()["misses"] == 1
+        finally:
+            sync.cancel()
+            await redis_client.delete(RevokedTokenFilter.STREAM_KEY)
+            await redis_client.aclose()
@@ -0,0 +1,86 @@
+import pytest
+import redis.asyncio as redis
+
+from core.config import settings
+from db.role_catalog import RoleCatalog
+from db.user_roles_cache import UserRolesCache
+from services.admin import AdminService
+from services.user import UserService, get_user_service
+from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
+from utils.user_roles_warmup import fill_user_roles_cache
+
+
+class TestUserRolesCache:
+    @pytest.mark.asyncio
+    async def test_admin_changes_invalidate(self, moderator, role):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        cache = UserRolesCache(redis_client, ttl=60)
+        user_service = UserService(async_session_maker, None, cache)
+        admin_service = AdminService(async_session_maker, roles_cache=cache)
+        try:
+            assert await user_service.get_user_role_titles(moderator.id) == [
+                "moderator"
+            ]
+            titles, _ = await cache.get(moderator.id)
+            assert titles == ["moderator"]
+
+            await admin_service.add_user_role(moderator.id, constants.TEST_ROLE_UUID)
+            titles, _ = await cache.get(moderator.id)
+            assert titles is None
+            assert sorted(await user_service.get_user_role_titles(moderator.id)) == [
+                "moderator",
+                "new role",
+            ]
+
+            await admin_service.remove_user_role(moderator.id, constants.TEST_ROLE_UUID)
+            assert await user_service.get_user_role_titles(moderator.id) == [
+                "moderator"
+            ]
+        finally:
+            await cache.invalidate(moderator.id)
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_fill_after_invalidate_is_ignored(self, moderator):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        cache = UserRolesCache(redis_client, ttl=60)
+        try:
+            # Читатель получил метку и роли до изменения, а записал после него
+            _, stamp = await cache.get(moderator.id)
+            await cache.invalidate(moderator.id)
+            await cache.put(moderator.id, ["admin"], stamp)
+
+            titles, _ = await cache.get(moderator.id)
+            assert titles is None
+        finally:
+            await cache.invalidate(moderator.id)
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warm_up(self, admin, moderator):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        catalog = RoleCatalog(async_session_maker, redis_client, poll_seconds=1)
+        await catalog.load()
+        cache = UserRolesCache(redis_client, ttl=60)
+        try:
+            assert await fill_user_roles_cache(async_session_maker, cache, 1) == 2
+
+            assert (await cache.get(constants.ADMIN_UUID))[0] == ["admin"]
+            assert (await cache.get(constants.MODERATOR_UUID))[0] == ["moderator"]
+
+            # Новая версия каталога делает все записи неактуальными
+            await catalog.invalidate()
+            assert (await cache.get(constants.ADMIN_UUID))[0] is None
+        finally:
+            await redis_client.aclose()
+
+    def test_not_used_without_catalog(self):
+        user_service = get_user_service(
+            postgres_session=async_session_maker,
+            password_hasher=None,
+            redis=None,
+            catalog=None,
+        )
+
+        assert user_service.roles_cache is None
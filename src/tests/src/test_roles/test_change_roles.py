@@ -44,6 +44,20 @@ class TestApiPutRoles:
         ), "Non-existent role should return 404"
         assert response.json().get("detail") == "Role not found."
 
+    @pytest.mark.asyncio
+    async def test_duplicate_title_change_role(
+        self, async_client, headers_admin, admin, role
+    ):
+        response = await async_client.put(
+            f"{self.endpoint}{role.id}",
+            headers=headers_admin,
+            json={"id": str(role.id), "title": "admin"},
+        )
+
+        assert (
+            response.status_code == status.HTTP_400_BAD_REQUEST
+        ), "Duplicate title should be rejected"
+
     @pytest.mark.asyncio
     async def test_moderator_change_role(
         self, async_client, headers_moderator, request_data, role
@@ -2,6 +2,11 @@ import uuid
 
 import pytest
 from fastapi import status
+from sqlalchemy import select
+
+from models import User
+from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
 
 
 class TestApiDeleteRoles:
@@ -24,6 +29,25 @@ class TestApiDeleteRoles:
             response.json().get("detail") == "Role deleted successfully"
         ), "Detail message mismatch"
 
+    @pytest.mark.asyncio
+    async def test_delete_assigned_role(
+        self, async_client, headers_admin, add_test_role_to_moderator, role
+    ):
+        response = await async_client.delete(
+            f"{self.endpoint}{role.id}",
+            headers=headers_admin,
+        )
+
+        assert (
+            response.status_code == status.HTTP_200_OK
+        ), "Assigned role should be deleted with its assignments"
+
+        async with async_session_maker() as session:
+            role_titles = await session.scalar(
+                select(User.role_titles).where(User.id == constants.MODERATOR_UUID)
+            )
+        assert role_titles == ["moderator"]
+
     @pytest.mark.asyncio
     async def test_not_found_delete_role(self, async_client, headers_admin):
         random_id = uuid.uuid4()
@@ -1,8 +1,11 @@
 import uuid
+from datetime import datetime, timedelta
 
 import pytest
 from fastapi import status
 
+from core.config import settings
+from services.auth import AuthService
 from tests import constants
 
 
@@ -73,9 +76,92 @@ class TestUserInfo:
         )
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+    @pytest.mark.parametrize("issued", ["legacy", "current"])
+    @pytest.mark.asyncio
+    async def test_with_refresh_token(
+        self, async_client, moderator, refresh_token_moderator, issued
+    ):
+        # Refresh-токен подписан тем же ключом, но не является bearer-токеном
+        if issued == "legacy":
+            refresh_token = refresh_token_moderator
+        else:
+            refresh_token = AuthService._generate_refresh_token(
+                str(moderator.id), datetime.now() + timedelta(days=1)
+            )
+
+        response = await async_client.get(
+            url=f"{self.endpoint}/{moderator.id}",
+            headers={"Authorization": f"Bearer {refresh_token}"},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     @pytest.mark.asyncio
     async def test_by_anonymous(self, async_client, admin):
         response = await async_client.get(
             url=f"{self.endpoint}/{admin.id}",
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestUsersInfoBatch:
+    def setup_method(self):
+        self.endpoint = "/api/v1/users/batch"
+
+    @pytest.mark.asyncio
+    async def test_batch(self, async_client, admin, moderator, headers_service):
+        missing_id = str(uuid.uuid4())
+        response = await async_client.post(
+            url=self.endpoint,
+            headers=headers_service,
+            json={
+                "user_ids": [
+                    constants.MODERATOR_UUID,
+                    missing_id,
+                    constants.ADMIN_UUID,
+                    constants.MODERATOR_UUID,
+                ]
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert [user["login"] for user in response_data["users"]] == [
+            constants.MODERATOR_LOGIN,
+            constants.ADMIN_LOGIN,
+        ]
+        assert response_data["not_found"] == [missing_id]
+
+    @pytest.mark.parametrize(
+        "user_ids",
+        [
+            [],
+            [str(uuid.uuid4()) for _ in range(settings.users_batch_max_ids + 1)],
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_batch_size_limits(self, async_client, headers_service, user_ids):
+        response = await async_client.post(
+            url=self.endpoint, headers=headers_service, json={"user_ids": user_ids}
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_batch_forbidden(self, async_client, moderator, headers_moderator):
+        response = await async_client.post(
+            url=self.endpoint,
+            headers=headers_moderator,
+            json={"user_ids": [constants.MODERATOR_UUID]},
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.asyncio
+    async def test_batch_forbidden_for_admin(self, async_client, admin, headers_admin):
+        response = await async_client.post(
+            url=self.endpoint,
+            headers=headers_admin,
+            json={"user_ids": [constants.ADMIN_UUID]},
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
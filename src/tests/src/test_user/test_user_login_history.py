@@ -1,8 +1,10 @@
 import uuid
+from datetime import timedelta, timezone
 
 import pytest
 from fastapi import status
 
+from api.pagination import encode_cursor
 from tests import constants
 
 
@@ -118,3 +120,127 @@ class TestUserLoginHistory:
             url=f"{self.endpoint}/{admin.id}/login_history",
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_pages_are_newest_first(
+        self, async_client, moderator, headers_admin, login_multiple_times
+    ):
+        response = await async_client.get(
+            url=f"{self.endpoint}/{moderator.id}/login_history",
+            headers=headers_admin,
+            params={"page": 2, "size": 2},
+        )
+
+        response_data = response.json()
+        assert response_data["total"] == 5
+        expected = sorted(
+            (event.event_date for event in login_multiple_times), reverse=True
+        )[2:4]
+        assert [item["event_date"] for item in response_data["items"]] == [
+            event_date.isoformat() for event_date in expected
+        ]
+
+
+class TestUserLoginHistoryCursor:
+    def setup_method(self):
+        self.endpoint = "/api/v1/users"
+
+    @pytest.mark.asyncio
+    async def test_walk_pages(
+        self, async_client, moderator, headers_admin, login_multiple_times
+    ):
+        url = f"{self.endpoint}/{moderator.id}/login_history/cursor"
+        event_dates = []
+        params = {"size": 2}
+        for _ in range(3):
+            response = await async_client.get(url, headers=headers_admin, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            response_data = response.json()
+            event_dates += [item["event_date"] for item in response_data["items"]]
+            params["cursor"] = response_data["next_cursor"]
+
+        assert params["cursor"] is None
+        assert event_dates == [
+            event_date.isoformat()
+            for event_date in sorted(
+                (event.event_date for event in login_multiple_times), reverse=True
+            )
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cursor_with_time_zone(
+        self, async_client, moderator, headers_admin, login_multiple_times
+    ):
+        # Тот же момент времени, записанный с часовым поясом
+        newest = max(login_multiple_times, key=lambda event: event.event_date)
+        moment = newest.event_date.replace(tzinfo=timezone.utc).astimezone(
+            timezone(timedelta(hours=3))
+        )
+        response = await async_client.get(
+            f"{self.endpoint}/{moderator.id}/login_history/cursor",
+            headers=headers_admin,
+            params={"cursor": encode_cursor(moment.isoformat(), uuid.UUID(int=0))},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == len(login_multiple_times) - 1
+
+    @pytest.mark.parametrize(
+        "user_id, params, expected_status",
+        [
+            (
+                constants.MODERATOR_UUID,
+                {"cursor": "invalid"},
+                status.HTTP_400_BAD_REQUEST,
+            ),
+            (
+                constants.MODERATOR_UUID,
+                {"cursor": constants.NUMERIC_ID_CURSOR},
+                status.HTTP_400_BAD_REQUEST,
+            ),
+            (str(uuid.uuid4()), {}, status.HTTP_404_NOT_FOUND),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_errors(
+        self, async_client, moderator, headers_admin, user_id, params, expected_status
+    ):
+        response = await async_client.get(
+            url=f"{self.endpoint}/{user_id}/login_history/cursor",
+            headers=headers_admin,
+            params=params,
+        )
+
+        assert response.status_code == expected_status
+
+
+class TestUserLoginHistoryCount:
+    @pytest.mark.parametrize(
+        "params, expected_total, expected_has_next",
+        [
+            ({"page": 1, "size": 2}, 5, True),
+            ({"page": 3, "size": 2}, 5, False),
+            ({"page": 1, "size": 2, "with_total": "false"}, None, True),
+            ({"page": 2, "size": 3, "with_total": "false"}, None, False),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_total_and_has_next(
+        self,
+        async_client,
+        moderator,
+        headers_admin,
+        login_multiple_times,
+        params,
+        expected_total,
+        expected_has_next,
+    ):
+        response = await async_client.get(
+            url=f"/api/v1/users/{moderator.id}/login_history",
+            headers=headers_admin,
+            params=params,
+        )
+
+        response_data = response.json()
+        assert response_data["total"] == expected_total
+        assert response_data["has_next"] is expected_has_next
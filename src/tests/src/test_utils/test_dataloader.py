@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from utils.dataloader import DataLoader
+
+
+class TestDataLoader:
+    @pytest.mark.asyncio
+    async def test_loads_keys_in_one_batch(self):
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(keys)
+            return {key: key * 2 for key in keys if key != 3}
+
+        loader = DataLoader(batch_load, default=0)
+        values = await asyncio.gather(
+            loader.load(1), loader.load(2), loader.load(1), loader.load(3)
+        )
+
+        assert values == [2, 4, 2, 0]
+        assert calls == [[1, 2, 3]]
+        assert await loader.load_many([2, 1]) == [4, 2]
+        assert calls == [[1, 2, 3]]
+
+    @pytest.mark.asyncio
+    async def test_error_is_not_cached(self):
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(keys)
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        with pytest.raises(RuntimeError):
+            await loader.load(1)
+
+        assert await loader.load(1) == 1
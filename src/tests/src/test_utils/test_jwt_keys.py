@@ -0,0 +1,70 @@
+import time
+
+import jwt
+import pytest
+
+from utils.jwt_keys import (JWTKeyring, expired_kids, generate_private_key,
+                            read_activations, record_activation)
+
+
+class TestJWTKeyring:
+    @pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+    def test_rotation_keeps_previous_keys_valid(self, tmp_path, algorithm):
+        (tmp_path / "2024-01-01.pem").write_bytes(generate_private_key(algorithm))
+        old_keyring = JWTKeyring(algorithm, "", str(tmp_path))
+        payload = {"user_id": "1", "exp": int(time.time()) + 60}
+        old_token = old_keyring.encode(payload)
+
+        (tmp_path / "2024-02-01.pem").write_bytes(generate_private_key(algorithm))
+        keyring = JWTKeyring(algorithm, "", str(tmp_path))
+        new_token = keyring.encode(payload)
+
+        assert jwt.get_unverified_header(new_token)["kid"] == "2024-02-01"
+        assert keyring.decode(old_token) == payload
+        assert keyring.decode(new_token) == payload
+        assert [key["kid"] for key in keyring.jwks()["keys"]] == [
+            "2024-01-01",
+            "2024-02-01",
+        ]
+
+    def test_unknown_kid_rejected(self, tmp_path):
+        (tmp_path / "a.pem").write_bytes(generate_private_key("EdDSA"))
+        other = tmp_path / "other"
+        other.mkdir()
+        (other / "b.pem").write_bytes(generate_private_key("EdDSA"))
+
+        token = JWTKeyring("EdDSA", "", str(other)).encode({"user_id": "1"})
+
+        with pytest.raises(jwt.exceptions.InvalidTokenError):
+            JWTKeyring("EdDSA", "", str(tmp_path)).decode(token)
+
+    def test_hmac_token_rejected_by_asymmetric_keyring(self, tmp_path):
+        (tmp_path / "a.pem").write_bytes(generate_private_key("RS256"))
+        token = jwt.encode({"user_id": "1"}, "secret", headers={"kid": "a"})
+
+        with pytest.raises(jwt.exceptions.InvalidTokenError):
+            JWTKeyring("RS256", "", str(tmp_path)).decode(token)
+
+
+class TestExpiredKids:
+    def test_counts_from_next_activation(self, tmp_path):
+        # Имена ключей не упорядочены по времени, а файлы созданы заранее
+        record_activation(tmp_path, "b", 0)
+        record_activation(tmp_path, "a", 1000)
+        record_activation(tmp_path, "c", 5000)
+        activations = read_activations(tmp_path)
+
+        assert expired_kids(activations, max_token_age=3000, now=5000) == ["b"]
+        assert expired_kids(activations, max_token_age=3000, now=8001) == ["b", "a"]
+
+    def test_reactivated_key_kept(self):
+        activations = [
+            {"kid": "a", "activated_at": 0},
+            {"kid": "b", "activated_at": 100},
+            {"kid": "a", "activated_at": 200},
+        ]
+
+        assert expired_kids(activations, max_token_age=50, now=1000) == ["b"]
+
+    def test_without_activations(self, tmp_path):
+        assert expired_kids(read_activations(tmp_path), max_token_age=0, now=1) == []
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from utils.password_hasher import HashPriority, PasswordHasher
+
+
+class TestPasswordHasher:
+    def setup_method(self):
+        self.hasher = PasswordHasher(workers=1)
+
+    def teardown_method(self):
+        self.hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_hash_and_check(self):
+        password_hash = await self.hasher.hash_password("secret")
+
+        assert await self.hasher.check_password(password_hash, "secret")
+        assert not await self.hasher.check_password(password_hash, "wrong")
+
+        stats = self.hasher.stats()
+        assert stats["submitted"] == stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_login_served_before_signup(self):
+        password_hash = await self.hasher.hash_password("secret")
+        finished = []
+
+        async def run(name, coro):
+            await coro
+            finished.append(name)
+
+        # Единственный воркер занят, остальные задачи ждут в очереди
+        busy = asyncio.create_task(run("busy", self.hasher.hash_password("busy")))
+        await asyncio.sleep(0)
+        signup = asyncio.create_task(
+            run("signup", self.hasher.hash_password("new", HashPriority.SIGNUP))
+        )
+        login = asyncio.create_task(
+            run("login", self.hasher.check_password(password_hash, "secret"))
+        )
+        await asyncio.gather(busy, signup, login)
+
+        assert finished == ["busy", "login", "signup"]
+        assert self.hasher.stats()["max_queue_depth"] == 2
@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from models import RefreshToken
+from tests.fixtures.db_fixtures import async_session_maker
+from utils import refresh_token_reaper
+from utils.refresh_token_reaper import (delete_expired_refresh_tokens,
+                                        run_refresh_token_reaper)
+
+
+class TestRefreshTokenReaper:
+    @pytest.mark.asyncio
+    async def test_delete_expired(self, moderator, refresh_token_moderator):
+        async with async_session_maker() as session:
+            session.add_all(
+                RefreshToken(
+                    user_id=moderator.id,
+                    token_hash=RefreshToken.hash_token(str(uuid.uuid4())),
+                    expires_at=datetime.now() - timedelta(days=i),
+                )
+                for i in range(1, 8)
+            )
+            await session.commit()
+
+        removed = await delete_expired_refresh_tokens(
+            async_session_maker, batch_size=3, pause=0
+        )
+        assert removed == 7
+
+        async with async_session_maker() as session:
+            results = await session.scalars(select(RefreshToken))
+            remaining = results.all()
+
+        assert [token.token_hash for token in remaining] == [
+            RefreshToken.hash_token(refresh_token_moderator)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_run_survives_db_errors(self, monkeypatch):
+        calls = 0
+
+        async def failing_delete(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                raise asyncio.CancelledError
+            raise OperationalError("DELETE", {}, Exception("connection reset"))
+
+        monkeypatch.setattr(
+            refresh_token_reaper, "delete_expired_refresh_tokens", failing_delete
+        )
+        monkeypatch.setattr(
+            refresh_token_reaper.settings, "refresh_token_reaper_interval_seconds", 0
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await run_refresh_token_reaper(async_session_maker)
+        assert calls == 3
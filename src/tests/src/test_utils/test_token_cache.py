@@ -0,0 +1,39 @@
+import time
+
+from utils.token_cache import DecodedTokenCache
+
+
+class TestDecodedTokenCache:
+    def test_hit_and_miss(self):
+        cache = DecodedTokenCache(max_size=10)
+        payload = {"user_id": "1", "exp": time.time() + 60}
+
+        assert cache.get("token") is None
+        cache.put("token", payload)
+        assert cache.get("token") is payload
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_entry_does_not_outlive_token(self):
+        cache = DecodedTokenCache(max_size=10)
+        cache.put("expired", {"user_id": "1", "exp": time.time() - 1})
+        cache.put("no_exp", {"user_id": "1"})
+
+        assert cache.get("expired") is None
+        assert cache.get("no_exp") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_eviction(self):
+        cache = DecodedTokenCache(max_size=2)
+        exp = time.time() + 60
+        cache.put("a", {"exp": exp})
+        cache.put("b", {"exp": exp})
+        cache.get("a")
+        cache.put("c", {"exp": exp})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["evicted"] == 1
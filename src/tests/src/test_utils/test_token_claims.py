@@ -0,0 +1,89 @@
+import time
+import uuid
+
+import pytest
+from fastapi import status
+
+from api.auth_utils import decode_token
+from core.config import settings
+from db import role_catalog
+from db.role_catalog import RoleCatalog
+from tests import constants
+from tests.fixtures.db_fixtures import async_session_maker
+from utils.jwt_keys import get_jwt_keyring
+from utils.token_claims import (COMPACT_VERSION, pack_access_claims,
+                                unpack_access_claims)
+
+
+@pytest.fixture
+async def catalog(moderator):
+    catalog = RoleCatalog(async_session_maker, None, poll_seconds=0)
+    await catalog.load(version=0)
+    role_catalog.role_catalog = catalog
+    yield catalog
+    role_catalog.role_catalog = None
+
+
+def make_claims(roles: list[str], epoch: int = 0) -> dict:
+    return {
+        "user_id": str(uuid.uuid4()),
+        "exp": int(time.time()) + 3600,
+        "roles": roles,
+        "epoch": epoch,
+        "jti": "jti",
+        "typ": "access",
+    }
+
+
+class TestTokenClaims:
+    @pytest.mark.asyncio
+    async def test_roundtrip_with_catalog(self, catalog):
+        claims = make_claims(["moderator", "unknown"], epoch=3)
+        payload = pack_access_claims(claims)
+
+        assert payload["v"] == COMPACT_VERSION
+        assert payload["r"] == [catalog.get_by_title("moderator").code, "unknown"]
+        assert len(payload["sub"]) == 22
+        assert unpack_access_claims(payload) == claims
+
+        # Коды удалённых ролей пропускаются
+        payload["r"].append(10_000)
+        assert unpack_access_claims(payload)["roles"] == ["moderator", "unknown"]
+
+    def test_without_catalog(self):
+        claims = make_claims(["admin"])
+        payload = pack_access_claims(claims)
+
+        assert "e" not in payload
+        assert payload["r"] == ["admin"]
+        assert unpack_access_claims(payload) == claims
+
+    def test_both_formats_decode(self):
+        claims = make_claims(["admin"])
+        keyring = get_jwt_keyring()
+
+        full = keyring.encode(claims)
+        compact = keyring.encode(pack_access_claims(claims))
+
+        assert len(compact) < len(full)
+        assert decode_token(full) == claims
+        assert decode_token(compact) == claims
+
+    @pytest.mark.asyncio
+    async def test_compact_login(self, async_client, catalog, monkeypatch):
+        monkeypatch.setattr(settings, "access_token_format", "compact")
+        response = await async_client.post(
+            "/api/v1/auth/login",
+            json={
+                "login": constants.MODERATOR_LOGIN,
+                "password": constants.MODERATOR_PASSWORD,
+            },
+        )
+        access_token = response.json()["access_token"]
+        assert get_jwt_keyring().decode(access_token)["v"] == COMPACT_VERSION
+
+        response = await async_client.get(
+            f"/api/v1/users/{constants.MODERATOR_UUID}",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
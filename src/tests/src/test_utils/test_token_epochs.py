@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+import redis.asyncio as redis
+
+from core.config import settings
+from utils.token_epochs import TokenEpochs
+
+
+class TestTokenEpochs:
+    @pytest.mark.asyncio
+    async def test_bump_revokes_issued_tokens(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        epochs = TokenEpochs(cache_seconds=60, max_size=100)
+        user_id = str(uuid.uuid4())
+        try:
+            issued = {
+                "user_id": user_id,
+                "epoch": await epochs.get(redis_client, user_id),
+            }
+            legacy = {"user_id": user_id}
+            assert await epochs.is_current(redis_client, issued)
+            assert await epochs.is_current(redis_client, legacy)
+
+            await epochs.bump(redis_client, user_id)
+
+            assert not await epochs.is_current(redis_client, issued)
+            assert not await epochs.is_current(redis_client, legacy)
+            reissued = {
+                "user_id": user_id,
+                "epoch": await epochs.get(redis_client, user_id),
+            }
+            assert await epochs.is_current(redis_client, reissued)
+        finally:
+            await redis_client.delete(TokenEpochs.KEY.format(user_id))
+            await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_local_cache(self):
+        redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+        worker_1 = TokenEpochs(cache_seconds=60, max_size=100)
+        worker_2 = TokenEpochs(cache_seconds=0, max_size=100)
+        user_ids = [str(uuid.uuid4()) for _ in range(2)]
+        try:
+            assert await worker_1.get_many_cached(redis_client, user_ids) == [0, 0]
+            await worker_2.bump(redis_client, user_ids[0])
+
+            # Первый воркер видит новую эпоху только после истечения кэша
+            assert await worker_1.get_many_cached(redis_client, user_ids) == [0, 0]
+            assert worker_1.stats()["hits"] == 2
+            assert await worker_2.get_many_cached(redis_client, user_ids) == [1, 0]
+        finally:
+            await redis_client.delete(
+                *(TokenEpochs.KEY.format(user_id) for user_id in user_ids)
+            )
+            await redis_client.aclose()
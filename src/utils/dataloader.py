@@ -0,0 +1,57 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class DataLoader:
+    """
+    Собирает ключи, запрошенные через load() в одном шаге event loop, и
+    загружает их одним вызовом batch_load. batch_load получает список
+    ключей и возвращает словарь ключ -> значение, отсутствующим ключам
+    достаётся default. Результаты кэшируются на время жизни загрузчика,
+    поэтому его создают на один запрос.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list], Awaitable[dict[Hashable, Any]]],
+        default: Any = None,
+    ):
+        self.batch_load = batch_load
+        self.default = default
+        self._cache: dict[Hashable, asyncio.Future] = {}
+        self._queue: list[Hashable] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        if key in self._cache:
+            return self._cache[key]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        # Загрузка откладывается до следующего шага, чтобы собрать ключи
+        if not self._queue:
+            loop.call_soon(self._schedule_dispatch)
+        self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: list[Hashable]) -> list[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _schedule_dispatch(self) -> None:
+        task = asyncio.create_task(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        try:
+            values = await self.batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                self._cache.pop(key).set_exception(e)
+            return
+
+        for key in keys:
+            self._cache[key].set_result(values.get(key, self.default))
@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Время в UTC без часового пояса, как оно хранится в колонках DateTime"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,153 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from core.config import settings
+
+SYMMETRIC_ALGORITHMS = {"HS256"}
+ACTIVATIONS_FILE = "activations.json"
+
+
+def generate_private_key(algorithm: str) -> bytes:
+    """Новый приватный ключ в PEM для RS256 или EdDSA"""
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"{algorithm} is not an asymmetric algorithm")
+
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+def read_activations(keys_dir: Path) -> list[dict[str, Any]]:
+    """Журнал активаций ключей: kid и время, с которого им подписываются токены"""
+    path = keys_dir / ACTIVATIONS_FILE
+    if not path.exists():
+        return []
+    return json.loads(path.read_text())
+
+
+def record_activation(keys_dir: Path, kid: str, activated_at: float) -> None:
+    activations = read_activations(keys_dir)
+    activations.append({"kid": kid, "activated_at": activated_at})
+    (keys_dir / ACTIVATIONS_FILE).write_text(json.dumps(activations, indent=2))
+
+
+def expired_kids(
+    activations: list[dict[str, Any]], max_token_age: int, now: float
+) -> list[str]:
+    """
+    Ключи, которые перестали подписывать токены раньше, чем max_token_age
+    назад. Ключ перестаёт подписывать в момент следующей активации, а при
+    повторной активации учитывается последняя. Последний активированный ключ
+    и ключи без записи в журнале не возвращаются.
+    """
+    entries = sorted(activations, key=lambda entry: entry["activated_at"])
+    replaced_at = {}
+    for entry, successor in zip(entries, entries[1:]):
+        replaced_at[entry["kid"]] = successor["activated_at"]
+    if entries:
+        replaced_at.pop(entries[-1]["kid"], None)
+
+    return [
+        kid
+        for kid, replaced in replaced_at.items()
+        if now - replaced > max_token_age
+    ]
+
+
+class JWTKeyring:
+    """
+    Ключи для подписи и проверки JWT. Для RS256/EdDSA ключи лежат в
+    keys_dir в файлах <kid>.pem: подписывает активный ключ, а все остальные
+    (в том числе только публичные) продолжают приниматься при проверке и
+    публикуются в JWKS, пока файл не удалён.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str,
+        keys_dir: str | None = None,
+        active_kid: str | None = None,
+    ):
+        self.algorithm = algorithm
+        self.secret = secret
+        self.kid: str | None = None
+        self.signing_key: Any = secret
+        self.public_keys: dict[str, Any] = {}
+
+        if algorithm not in SYMMETRIC_ALGORITHMS:
+            self._load(Path(keys_dir), active_kid)
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm in SYMMETRIC_ALGORITHMS
+
+    def _load(self, keys_dir: Path, active_kid: str | None) -> None:
+        private_keys = {}
+        for path in sorted(keys_dir.glob("*.pem")):
+            data = path.read_bytes()
+            try:
+                private_key = serialization.load_pem_private_key(data, password=None)
+            except ValueError:
+                self.public_keys[path.stem] = serialization.load_pem_public_key(data)
+                continue
+            private_keys[path.stem] = private_key
+            self.public_keys[path.stem] = private_key.public_key()
+
+        if not private_keys:
+            raise RuntimeError(f"No private JWT keys found in {keys_dir}")
+
+        # По умолчанию подписываем последним по имени ключом
+        self.kid = active_kid or max(private_keys)
+        if self.kid not in private_keys:
+            raise RuntimeError(f"Private JWT key {self.kid} not found in {keys_dir}")
+        self.signing_key = private_keys[self.kid]
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        headers = {"kid": self.kid} if self.kid else None
+        return jwt.encode(
+            payload, self.signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def decode(self, token: str) -> dict[str, Any]:
+        if self.is_symmetric:
+            return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.public_keys.get(kid)
+        if key is None:
+            raise jwt.exceptions.InvalidTokenError(f"Unknown kid {kid}")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        keys = []
+        for kid, public_key in self.public_keys.items():
+            if self.algorithm == "RS256":
+                jwk = RSAAlgorithm.to_jwk(public_key, as_dict=True)
+            else:
+                jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)
+            keys.append({**jwk, "kid": kid, "alg": self.algorithm, "use": "sig"})
+        return {"keys": keys}
+
+
+@lru_cache()
+def get_jwt_keyring() -> JWTKeyring:
+    return JWTKeyring(
+        settings.jwt_algorithm,
+        settings.jwt_secret_key,
+        settings.jwt_keys_dir,
+        settings.jwt_active_kid,
+    )
@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from enum import IntEnum
+from typing import Any, Callable
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from core.config import settings
+
+
+class HashPriority(IntEnum):
+    """Чем меньше значение, тем раньше задача попадёт в пул"""
+
+    LOGIN = 0
+    SIGNUP = 1
+
+
+@dataclass
+class HasherMetrics:
+    submitted: int = 0
+    dispatched: int = 0
+    completed: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+    submitted_by_priority: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def wait_time_avg(self) -> float:
+        if not self.dispatched:
+            return 0.0
+        return self.wait_time_total / self.dispatched
+
+
+class PasswordHasher:
+    """
+    Выполняет хеширование и проверку паролей в ограниченном пуле процессов,
+    чтобы не блокировать event loop. Задачи ожидают свободного воркера в
+    очереди с приоритетом: проверки при логине обслуживаются раньше
+    хеширования паролей при регистрации.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.metrics = HasherMetrics()
+        self._executor: ProcessPoolExecutor | None = None
+        self._queue: list[tuple] = []
+        self._counter = itertools.count()
+        self._busy = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(
+        self, priority: HashPriority, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue,
+            (priority, next(self._counter), time.monotonic(), func, args, future),
+        )
+
+        self.metrics.submitted += 1
+        self.metrics.submitted_by_priority[priority.name] = (
+            self.metrics.submitted_by_priority.get(priority.name, 0) + 1
+        )
+        self.metrics.queue_depth = len(self._queue)
+        self.metrics.max_queue_depth = max(
+            self.metrics.max_queue_depth, self.metrics.queue_depth
+        )
+
+        self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._queue and self._busy < self.workers:
+            _, _, enqueued_at, func, args, future = heapq.heappop(self._queue)
+            self.metrics.queue_depth = len(self._queue)
+            if future.cancelled():
+                continue
+
+            self.metrics.dispatched += 1
+            waited = time.monotonic() - enqueued_at
+            self.metrics.wait_time_total += waited
+            self.metrics.wait_time_max = max(self.metrics.wait_time_max, waited)
+
+            self._busy += 1
+            pool_future = loop.run_in_executor(self._get_executor(), func, *args)
+            pool_future.add_done_callback(
+                lambda done, target=future: self._on_done(done, target)
+            )
+
+    def _on_done(self, done: asyncio.Future, target: asyncio.Future) -> None:
+        self._busy -= 1
+        self.metrics.completed += 1
+        if not target.cancelled():
+            if done.cancelled():
+                target.cancel()
+            elif done.exception() is not None:
+                target.set_exception(done.exception())
+            else:
+                target.set_result(done.result())
+        self._dispatch()
+
+    async def hash_password(
+        self, password: str, priority: HashPriority = HashPriority.SIGNUP
+    ) -> str:
+        return await self._submit(priority, generate_password_hash, password)
+
+    async def check_password(
+        self,
+        password_hash: str,
+        password: str,
+        priority: HashPriority = HashPriority.LOGIN,
+    ) -> bool:
+        return await self._submit(
+            priority, check_password_hash, password_hash, password
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **asdict(self.metrics),
+            "wait_time_avg": self.metrics.wait_time_avg,
+            "busy_workers": self._busy,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers)
+
+
+async def get_password_hasher() -> PasswordHasher:
+    return password_hasher
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+from core.config import settings
+from db import postgres
+from models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+async def delete_expired_refresh_tokens(
+    session_maker: async_sessionmaker, batch_size: int, pause: float
+) -> int:
+    """
+    Удаляет истёкшие refresh-токены небольшими пачками в порядке
+    (expires_at, id). Каждая пачка - отдельная короткая транзакция, строки,
+    заблокированные другими запросами, пропускаются. Возвращает число
+    удалённых строк.
+    """
+    now = datetime.now()
+    removed = 0
+    last_key = None
+
+    while True:
+        batch = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < now)
+            .order_by(RefreshToken.expires_at, RefreshToken.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if last_key:
+            batch = batch.where(
+                tuple_(RefreshToken.expires_at, RefreshToken.id) > last_key
+            )
+
+        async with session_maker() as session:
+            results = await session.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.id.in_(batch.scalar_subquery()))
+                .returning(RefreshToken.expires_at, RefreshToken.id)
+            )
+            deleted = results.all()
+            await session.commit()
+
+        # SKIP LOCKED отбрасывает заблокированные строки до LIMIT, поэтому
+        # неполная пачка значит, что доступных истёкших строк больше нет
+        removed += len(deleted)
+        if len(deleted) < batch_size:
+            return removed
+
+        last_key = max(tuple(row) for row in deleted)
+        await asyncio.sleep(pause)
+
+
+async def run_refresh_token_reaper(session_maker: async_sessionmaker) -> None:
+    while True:
+        try:
+            removed = await delete_expired_refresh_tokens(
+                session_maker,
+                batch_size=settings.refresh_token_reaper_batch_size,
+                pause=settings.refresh_token_reaper_pause_ms / 1000,
+            )
+            logger.info("Removed %s expired refresh tokens", removed)
+        except SQLAlchemyError:
+            # Следующий проход будет через обычный интервал
+            logger.exception("Expired refresh tokens cleanup failed")
+        await asyncio.sleep(settings.refresh_token_reaper_interval_seconds)
+
+
+async def reap_expired_refresh_tokens(batch_size: int, pause: float) -> int:
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    try:
+        return await delete_expired_refresh_tokens(async_session, batch_size, pause)
+    finally:
+        await engine.dispose()
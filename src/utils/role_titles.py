@@ -0,0 +1,61 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+from core.config import settings
+from db import postgres
+from models.user import User
+
+
+async def find_stale_role_titles(
+    session_maker: async_sessionmaker, batch_size: int, fix: bool = False
+) -> list:
+    """
+    Сверяет users.role_titles с user_role пачками по id и возвращает id
+    пользователей с расхождением. При fix расхождения исправляются.
+    """
+    stale = []
+    last_id = None
+
+    while True:
+        query = select(User.id).order_by(User.id).limit(batch_size)
+        if last_id:
+            query = query.where(User.id > last_id)
+
+        async with session_maker() as session:
+            ids = list(await session.scalars(query))
+            if not ids:
+                return stale
+
+            found = list(
+                await session.scalars(
+                    select(User.id).where(
+                        User.id.in_(ids),
+                        User.role_titles != func.user_role_titles(User.id),
+                    )
+                )
+            )
+            if fix and found:
+                await session.execute(
+                    update(User)
+                    .where(User.id.in_(found))
+                    .values(role_titles=func.user_role_titles(User.id))
+                )
+                await session.commit()
+
+        stale.extend(found)
+        if len(ids) < batch_size:
+            return stale
+
+        last_id = ids[-1]
+
+
+async def check_role_titles(batch_size: int, fix: bool = False) -> list:
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    try:
+        return await find_stale_role_titles(async_session, batch_size, fix)
+    finally:
+        await engine.dispose()
@@ -0,0 +1,79 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from core.config import settings
+
+
+@dataclass
+class TokenCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class DecodedTokenCache:
+    """
+    LRU-кэш проверенных payload'ов JWT. Ключ - digest токена, запись
+    живёт не дольше, чем поле exp самого токена.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.metrics = TokenCacheMetrics()
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.metrics.misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.metrics.expired += 1
+            self.metrics.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.metrics.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        # Токены без exp не кэшируем: их время жизни неизвестно
+        if "exp" not in payload:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (payload["exp"], payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.metrics.evicted += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **asdict(self.metrics),
+            "hit_rate": self.metrics.hit_rate,
+            "size": len(self._entries),
+        }
+
+
+decoded_token_cache = DecodedTokenCache(settings.decoded_token_cache_size)
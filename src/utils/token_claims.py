@@ -0,0 +1,79 @@
+import base64
+import uuid
+from typing import Any
+
+from db import role_catalog
+
+# Версия компактного формата access-токена. Токены без "v" выпущены в
+# полном формате, поэтому оба формата принимаются одновременно.
+COMPACT_VERSION = 2
+
+# Тип токена в claim "typ". Bearer-токеном может быть только access-токен
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+def _pack_user_id(user_id: str) -> str:
+    return base64.urlsafe_b64encode(uuid.UUID(str(user_id)).bytes).rstrip(b"=").decode()
+
+
+def _unpack_user_id(value: str) -> str:
+    return str(uuid.UUID(bytes=base64.urlsafe_b64decode(value + "==")))
+
+
+def pack_access_claims(claims: dict[str, Any]) -> dict[str, Any]:
+    """
+    Компактные claims: id пользователя в base64url, роли кодами из каталога
+    ролей. Роли, которых нет в каталоге, остаются названиями. Тип токена
+    не хранится, компактным бывает только access-токен.
+    """
+    catalog = role_catalog.role_catalog
+    roles = []
+    for title in claims["roles"]:
+        role = catalog.get_by_title(title) if catalog else None
+        roles.append(role.code if role else title)
+
+    payload = {
+        "v": COMPACT_VERSION,
+        "sub": _pack_user_id(claims["user_id"]),
+        "exp": claims["exp"],
+        "r": roles,
+        "jti": claims["jti"],
+    }
+    # Нулевая эпоха подразумевается по умолчанию
+    if claims["epoch"]:
+        payload["e"] = claims["epoch"]
+    return payload
+
+
+def unpack_access_claims(payload: dict[str, Any]) -> dict[str, Any]:
+    """Приводит payload любого формата к полным claims"""
+    if payload.get("v") != COMPACT_VERSION:
+        return payload
+
+    catalog = role_catalog.role_catalog
+    roles = []
+    for role in payload["r"]:
+        if isinstance(role, str):
+            roles.append(role)
+            continue
+        # Код удалённой роли просто пропускается
+        catalog_role = catalog.get_by_code(role) if catalog else None
+        if catalog_role:
+            roles.append(catalog_role.title)
+
+    return {
+        "user_id": _unpack_user_id(payload["sub"]),
+        "exp": payload["exp"],
+        "roles": roles,
+        "epoch": payload.get("e", 0),
+        "jti": payload["jti"],
+        "typ": ACCESS_TOKEN_TYPE,
+    }
+
+
+def is_access_claims(claims: dict[str, Any]) -> bool:
+    # У access-токенов, выпущенных до появления typ, всегда есть роли,
+    # у refresh-токенов их нет
+    default = ACCESS_TOKEN_TYPE if "roles" in claims else None
+    return claims.get("typ", default) == ACCESS_TOKEN_TYPE
@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from redis.asyncio import Redis
+
+from core.config import settings
+
+
+@dataclass
+class TokenEpochMetrics:
+    hits: int = 0
+    misses: int = 0
+    bumps: int = 0
+
+
+class TokenEpochs:
+    """
+    Эпохи токенов пользователей. Токен несёт эпоху владельца на момент
+    выпуска, а увеличение эпохи в Redis одной записью отзывает все ранее
+    выданные токены пользователя. При проверке эпоха берётся из локального
+    кэша не старше cache_seconds, при выпуске токена - всегда из Redis.
+    """
+
+    KEY = "token_epoch:{}"
+
+    def __init__(self, cache_seconds: float, max_size: int):
+        self.cache_seconds = cache_seconds
+        self.max_size = max_size
+        self.metrics = TokenEpochMetrics()
+        self._entries: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    def _put(self, user_id: str, epoch: int) -> None:
+        self._entries[user_id] = (time.monotonic() + self.cache_seconds, epoch)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _cached(self, user_id: str) -> int | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self.metrics.misses += 1
+            return None
+
+        self.metrics.hits += 1
+        return entry[1]
+
+    async def get(self, redis: Redis, user_id: str) -> int:
+        """Текущая эпоха из Redis"""
+        epoch = int(await redis.get(self.KEY.format(user_id)) or 0)
+        self._put(user_id, epoch)
+        return epoch
+
+    async def get_many_cached(self, redis: Redis, user_ids: list[str]) -> list[int]:
+        """Эпохи для проверки токенов, промахи кэша читаются одним MGET"""
+        epochs = [self._cached(user_id) for user_id in user_ids]
+        missing = sorted(
+            {user_ids[i] for i, epoch in enumerate(epochs) if epoch is None}
+        )
+        if missing:
+            values = await redis.mget([self.KEY.format(user_id) for user_id in missing])
+            fetched = {}
+            for user_id, value in zip(missing, values):
+                fetched[user_id] = int(value or 0)
+                self._put(user_id, fetched[user_id])
+            epochs = [
+                fetched[user_ids[i]] if epoch is None else epoch
+                for i, epoch in enumerate(epochs)
+            ]
+        return epochs
+
+    async def is_current(self, redis: Redis, payload: dict[str, Any]) -> bool:
+        # Токены, выпущенные до появления эпох, относятся к эпохе 0
+        (epoch,) = await self.get_many_cached(redis, [payload["user_id"]])
+        return payload.get("epoch", 0) >= epoch
+
+    async def bump(self, redis: Redis, user_id: str) -> int:
+        """Отзывает все выданные пользователю токены"""
+        epoch = await redis.incr(self.KEY.format(user_id))
+        self._put(user_id, epoch)
+        self.metrics.bumps += 1
+        return epoch
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {**asdict(self.metrics), "size": len(self._entries)}
+
+
+token_epochs = TokenEpochs(
+    settings.token_epoch_cache_seconds, settings.token_epoch_cache_size
+)
@@ -0,0 +1,62 @@
+from redis.asyncio import Redis
+from sqlalchemy import any_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+from core.config import settings
+from db import postgres
+from db.user_roles_cache import UserRolesCache
+from models.user import User
+
+
+async def fill_user_roles_cache(
+    session_maker: async_sessionmaker, cache: UserRolesCache, batch_size: int
+) -> int:
+    """
+    Заполняет кэш ролей всех пользователей. Пользователи читаются пачками
+    по id, метки пачки берутся до чтения ролей, роли пишутся в Redis одним
+    pipeline. Возвращает число обработанных пользователей.
+    """
+    warmed = 0
+    last_id = None
+
+    while True:
+        query = select(User.id).order_by(User.id).limit(batch_size)
+        if last_id:
+            query = query.where(User.id > last_id)
+
+        async with session_maker() as session:
+            user_ids = list(await session.scalars(query))
+            stamps = await cache.stamps([str(user_id) for user_id in user_ids])
+            rows = await session.execute(
+                select(User.id, User.role_titles).where(
+                    User.id == any_(literal(user_ids, ARRAY(User.id.type)))
+                )
+            )
+            user_roles = {str(row.id): row.role_titles for row in rows}
+
+        await cache.put_many(user_roles, stamps)
+        warmed += len(user_ids)
+        if len(user_ids) < batch_size:
+            return warmed
+
+        last_id = user_ids[-1]
+
+
+async def warm_user_roles_cache(batch_size: int) -> int:
+    # Сервис не читает кэш без каталога ролей
+    if not settings.role_catalog_enabled or not settings.user_roles_cache_enabled:
+        return 0
+
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    redis = Redis(host=settings.redis_host, port=settings.redis_port)
+    cache = UserRolesCache(redis, settings.user_roles_cache_ttl)
+    try:
+        return await fill_user_roles_cache(async_session, cache, batch_size)
+    finally:
+        await redis.aclose()
+        await engine.dispose()